@@ -0,0 +1,65 @@
+# Bootstrap confidence intervals: time per selection against a Python loop of
+# resamples, and coverage of the intervals on data with a known mean
+#
+#   python benchmarks/bench_bootstrap.py [rows ...]
+import os
+import sys
+import time
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate
+from components.bootstrap import CONFIDENCE, N_RESAMPLES, Bootstrap, resample_means
+
+SIZES = [5_000, 100_000, 1_000_000, 4_000_000]
+REPEAT = 3
+COVERAGE_TRIALS = 200
+
+
+def _loop_means(values: np.ndarray, n_resamples: int, seed=0) -> np.ndarray:
+    # The straightforward version: one resample per iteration, every row drawn
+    rng = np.random.default_rng(seed)
+    return np.array([rng.choice(values, size=len(values)).mean() for _ in range(n_resamples)])
+
+
+def _time(fn) -> float:
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    return min(times)
+
+
+def coverage(n_rows: int, trials: int = COVERAGE_TRIALS) -> float:
+    # Share of intervals containing the true mean of a heavy-tailed distribution
+    rng = np.random.default_rng(11)
+    alpha = (1 - CONFIDENCE) / 2
+    hits = 0
+    for trial in range(trials):
+        values = rng.lognormal(0, 1, n_rows)
+        low, high = np.quantile(resample_means(values, seed=trial), [alpha, 1 - alpha])
+        hits += low < np.exp(0.5) < high
+    return hits / trials
+
+
+def main(sizes: list) -> None:
+    Bootstrap(generate(100, seed=1)["Views"], generate(100, seed=1)["Platform"])  # shared resample counts
+    print(f"{'rows':>10} {'platforms, vectorized':>22} {'one group, loop':>16}")
+    for n in sizes:
+        df = generate(n, seed=3)
+        views, platforms = df["Views"], df["Platform"].astype("category")
+        vectorized = _time(lambda: Bootstrap(views, platforms))
+        # The loop draws every row of every resample: timed on 50 and scaled to N_RESAMPLES
+        group = views[platforms == platforms.cat.categories[0]].to_numpy(dtype=np.float64)
+        loop = _time(lambda: _loop_means(group, 50)) * N_RESAMPLES / 50
+        print(f"{n:>10,} {vectorized:19.1f} ms {loop:13.0f} ms")
+    for n in (200, 5_000):
+        print(f"coverage of {CONFIDENCE:.0%} intervals, {n:,} lognormal rows: {coverage(n):.3f}")
+
+
+if __name__ == "__main__":
+    main([int(n) for n in sys.argv[1:]] or SIZES)
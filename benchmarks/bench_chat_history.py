@@ -0,0 +1,97 @@
+# Chatbot rerun cost and session memory against the length of the chat: a
+# rerun must cost about the same after 10k messages as after 100, and a
+# repeated question must come back from the context's memo
+#
+#   python benchmarks/bench_chat_history.py [messages ...]
+#
+# Exits 1 when the rerun with the longest history is slower than the shortest
+# by more than FLAT_TOLERANCE (and MIN_DELTA_MS).
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.suite import _app, _rerun
+from components.chathistory import ChatHistory
+
+# From 100 messages on, the recent messages and a page of earlier ones are all rendered
+SIZES = [100, 1_000, 10_000]
+REPEAT = 10
+FLAT_TOLERANCE = 0.5
+MIN_DELTA_MS = 10.0
+ANSWER = "Top platform: YouTube (2545648.40) by views"
+
+
+def _history(n_messages: int, maxlen: int) -> ChatHistory:
+    history = ChatHistory(maxlen)
+    for i in range(n_messages):
+        if i % 2 == 0:
+            history.append("user", f"best platform for views #{i}")
+        else:
+            history.append("assistant", ANSWER)
+    return history
+
+
+def _dicts(n_messages: int) -> list:
+    # The previous representation: a list of dicts with a role string per message
+    return [{"role": "user" if i % 2 == 0 else "assistant",
+             "content": f"best platform for views #{i}" if i % 2 == 0 else ANSWER} for i in range(n_messages)]
+
+
+def _allocated_kb(build, n_messages: int) -> float:
+    tracemalloc.start()
+    kept = build(n_messages)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return size / 1024
+
+
+def rerun_ms(n_messages: int, maxlen: int) -> float:
+    at = _app("chatbot_assitant.py")
+    at.run()
+    at.session_state["chat_history"] = _history(n_messages, maxlen)
+    return float(np.median([_rerun(at) for _ in range(REPEAT)]))
+
+
+def memo_ms() -> tuple:
+    # First and repeated answer to the same question, same context
+    from components.engine import ChatEngine, stream_answer
+
+    ctx = ChatEngine().ctx
+    times = []
+    for query in ("Compare TikTok vs Instagram likes and shares", "compare tiktok vs instagram, likes & shares?"):
+        t0 = time.perf_counter()
+        "".join(stream_answer(query, ctx))
+        times.append((time.perf_counter() - t0) * 1000)
+    return tuple(times)
+
+
+def main(sizes: list) -> bool:
+    logging.disable(logging.WARNING)
+    maxlen = max(sizes)  # every message kept: only rendering is bounded
+    rerun_ms(10, maxlen)  # warm imports and the dataset
+    print(f"{'messages':>10} {'rerun':>10} {'ring buffer':>14} {'list of dicts':>14}")
+    reruns = {}
+    for n in sizes:
+        reruns[n] = rerun_ms(n, maxlen)
+        print(f"{n:>10,} {reruns[n]:7.1f} ms {_allocated_kb(lambda k: _history(k, k), n):11.0f} KB "
+              f"{_allocated_kb(_dicts, n):11.0f} KB")
+    first, repeated = memo_ms()
+    print(f"answer: first {first:.2f} ms, repeated {repeated:.3f} ms")
+
+    short, long = reruns[min(sizes)], reruns[max(sizes)]
+    flat = long <= short * (1 + FLAT_TOLERANCE) or long - short <= MIN_DELTA_MS
+    print(f"rerun cost {'flat' if flat else 'GROWS'}: {short:.1f} ms at {min(sizes):,} messages, "
+          f"{long:.1f} ms at {max(sizes):,}")
+    return flat
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main([int(n) for n in sys.argv[1:]] or SIZES) else 1)
@@ -0,0 +1,117 @@
+# Chatbot page latency on a large export: time to first render after a sidebar
+# change, against what the page would block for if it built the selection's
+# context and aggregates before rendering; then the time to an answer, asked
+# right away or after the background precompute had a moment
+#
+#   python benchmarks/bench_chat_latency.py [rows] [--budget-ms 250]
+#
+# Exits 1 when the median first render exceeds the budget, or when a question
+# asked with nothing selected leaves the chat without its input box.
+import argparse
+import logging
+import multiprocessing as mp
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.suite import _app, _dataset, _rerun
+
+# Sidebar changes measured, and the pause before a question that follows one
+CHANGES = 8
+THINK_TIME = 1.0
+HISTORY_MESSAGES = 40
+
+
+def _blocking_ms(regions: list) -> float:
+    # What the page waited for before rendering when the context was built inline
+    from components.analytics import AnalyticsContext
+    from components.data import get_dataset
+    from components.engine import ENGINE_COLUMNS
+    from components.filters import select_index
+    from components.ingest import load_aggregates
+
+    filters = {"Region": regions}
+    t0 = time.perf_counter()
+    AnalyticsContext(get_dataset().frame(ENGINE_COLUMNS), select_index(filters),
+                     load_aggregates().hashtags, filters).precompute()
+    return (time.perf_counter() - t0) * 1000
+
+
+def _measure(path: str) -> dict:
+    # Runs in a fresh process: TRENDS_CSV is set by the parent before spawning
+    logging.disable(logging.WARNING)
+    from components import data
+    from components.chathistory import ChatHistory
+
+    data.convert(path, data.line_end(path))
+    at = _app("chatbot_assitant.py")
+    cold = _rerun(at)
+    history = ChatHistory()
+    for i in range(HISTORY_MESSAGES):
+        history.append("user" if i % 2 == 0 else "assistant", f"message {i}")
+    at.session_state["chat_history"] = history
+    regions = list(at.sidebar.multiselect[1].options)
+    rng = np.random.default_rng(0)
+    results = {"cold_ms": cold, "render_ms": [], "blocking_ms": [], "answer_now_ms": [], "answer_later_ms": []}
+    for i in range(CHANGES):
+        selection = list(rng.choice(regions, size=rng.integers(1, len(regions)), replace=False))
+        results["blocking_ms"].append(_blocking_ms(selection))
+        at.sidebar.multiselect[1].set_value(selection)
+        results["render_ms"].append(_rerun(at))
+        # Alternately ask at once (waits for the precompute) or after a pause
+        if i % 2:
+            time.sleep(THINK_TIME)
+        at.chat_input[0].set_value("Compare TikTok vs Instagram likes and shares")
+        results["answer_later_ms" if i % 2 else "answer_now_ms"].append(_rerun(at))
+    results["empty_selection_ok"] = _empty_selection(at, regions)
+    return results
+
+
+def _empty_selection(at, regions: list) -> bool:
+    # Nothing selected, a question, then a selection again: the chat must still take input
+    at.sidebar.multiselect[1].set_value([])
+    _rerun(at)
+    at.chat_input[0].set_value("What is the best platform for views?")
+    _rerun(at)
+    at.sidebar.multiselect[1].set_value(regions)
+    _rerun(at)
+    return len(at.chat_input) == 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Chatbot page time to first render on a large dataset.")
+    parser.add_argument("rows", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--budget-ms", type=float, default=250.0, help="median first render allowed")
+    args = parser.parse_args(argv)
+
+    os.environ["TRENDS_CSV"] = _dataset(args.rows, args.seed)
+    with ProcessPoolExecutor(1, mp_context=mp.get_context("spawn")) as pool:
+        r = pool.submit(_measure, os.environ["TRENDS_CSV"]).result()
+
+    print(f"rows={args.rows:,}  cold start {r['cold_ms']:.0f} ms")
+    for name, label in (("render_ms", "first render after a sidebar change"),
+                        ("blocking_ms", "context + aggregates, if built inline"),
+                        ("answer_now_ms", "answer asked right after the change"),
+                        ("answer_later_ms", f"answer asked {THINK_TIME:.0f} s after the change")):
+        times = np.array(r[name])
+        print(f"  {label:40s} {np.median(times):8.1f} ms median  (min {times.min():.1f}, max {times.max():.1f})")
+    if not r["empty_selection_ok"]:
+        print("FAIL: no chat input after a question with an empty selection")
+        return 1
+    render = float(np.median(r["render_ms"]))
+    if render > args.budget_ms:
+        print(f"FAIL: first render {render:.1f} ms > budget {args.budget_ms:.0f} ms")
+        return 1
+    print(f"ok: first render within {args.budget_ms:.0f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+# Chatbot messages per second: shared AnalyticsContext vs rebuilding per message
+#
+#   python benchmarks/bench_chatbot.py 1000000
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate
+from components.data import DTYPES
+from components.analytics import AnalyticsContext
+from components.engine import generate_response
+
+QUERIES = [
+    "What is the best platform for views?",
+    "Which platform has the lowest engagement rate?",
+    "Which content type gets the most likes?",
+    "Compare TikTok vs Instagram",
+    "What are the top hashtags?",
+    "Provide strategy tips",
+    "Show overall average metrics",
+    "Top regions",
+]
+
+
+def messages_per_second(df, n_messages: int, shared: bool) -> float:
+    ctx = AnalyticsContext(df)
+    t0 = time.perf_counter()
+    for i in range(n_messages):
+        if not shared:
+            # Old behaviour: every aggregate recomputed for every message
+            ctx = AnalyticsContext(df)
+        generate_response(QUERIES[i % len(QUERIES)], ctx)
+    return n_messages / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    df = generate(n_rows).astype({c: t for c, t in DTYPES.items() if c != "Post_ID"})
+    print(f"rows={n_rows}")
+    print(f"per-message rebuild: {messages_per_second(df, 16, shared=False):10.1f} msg/s")
+    print(f"shared context:      {messages_per_second(df, 2000, shared=True):10.1f} msg/s")
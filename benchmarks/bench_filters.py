@@ -0,0 +1,86 @@
+# Sidebar filtering: chained isin() masks vs the bitmap FilterIndex
+#
+#   python benchmarks/bench_filters.py 1000000 10000000
+#
+# Every combination of selected values is timed for the Platform x Region
+# filter (Trend Overview); the Platform x Region x Content_Type filter
+# (chatbot) is sampled.
+import itertools
+import os
+import random
+import sys
+import tempfile
+import time
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_csv
+from components import data
+from components.filters import FilterIndex
+
+
+def _subsets(values):
+    return [list(c) for r in range(len(values) + 1) for c in itertools.combinations(values, r)]
+
+
+def _isin_mask(df, selection):
+    mask = None
+    for dim, chosen in selection.items():
+        m = df[dim].isin(chosen)
+        mask = m if mask is None else mask & m
+    return mask
+
+
+def _bitmap_rows(index, df, selection):
+    mask = index.mask(selection)
+    return df if mask is None else df.take(np.flatnonzero(mask))
+
+
+def _time(fn, selections):
+    t0 = time.perf_counter()
+    for sel in selections:
+        fn(sel)
+    return (time.perf_counter() - t0) / len(selections) * 1000
+
+
+def run(n_rows: int, workdir: str, samples: int):
+    path = os.path.join(workdir, f"synthetic_{n_rows}.csv")
+    write_csv(path, n_rows)
+    data.CACHE_DIR = os.path.join(workdir, "cache")
+    ds = data.Dataset(path)
+    df = ds.frame(["Platform", "Region", "Content_Type", "Likes"])
+
+    t0 = time.perf_counter()
+    index = FilterIndex(ds).update()
+    build_ms = (time.perf_counter() - t0) * 1000
+    cats = index.categories
+
+    rng = random.Random(0)
+    two_way = [{"Platform": p, "Region": r} for p in _subsets(cats["Platform"]) for r in _subsets(cats["Region"])]
+    if samples < len(two_way):
+        two_way = rng.sample(two_way, samples)
+    three_way = [{dim: rng.sample(cats[dim], rng.randint(0, len(cats[dim]))) for dim in index.dims}
+                 for _ in range(samples)]
+
+    print(f"rows={n_rows} index build {build_ms:.0f} ms")
+    for name, selections in (("platform x region", two_way), ("platform x region x content", three_way)):
+        isin = _time(lambda s: df[_isin_mask(df, s)], selections)
+        bitmap = _time(lambda s: _bitmap_rows(index, df, s), selections)
+        for sel in selections:
+            index.select(sel, ["Platform", "Region", "Content_Type", "Likes"])
+        cached = _time(lambda s: index.select(s, ["Platform", "Region", "Content_Type", "Likes"]), selections[-8:])
+        print(f"  {name:28s} ({len(selections)} selections): isin {isin:8.2f} ms  "
+              f"bitmap {bitmap:8.2f} ms  cached view {cached:8.4f} ms")
+
+
+if __name__ == "__main__":
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    sizes = [int(a) for a in args] or [1_000_000, 10_000_000]
+    # --all times every Platform x Region combination (4096 of them) instead of a sample
+    n_samples = 1 << 30 if "--all" in sys.argv else 64
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            run(n, tmp, n_samples)
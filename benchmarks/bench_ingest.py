@@ -0,0 +1,153 @@
+# Incremental ingestion: checks that many small appends give the same dataset and
+# running aggregates as a full recompute, and compares refresh vs full reload time;
+# also checks trend bins over sparse post IDs arriving out of order, and exports
+# whose last row has no trailing newline
+#
+#   python benchmarks/bench_ingest.py [initial_rows] [appends]
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate
+from components import data
+from components.cube import build_cube
+from components.ingest import AGGREGATE_COLUMNS, RunningAggregates
+from components.trends import TrendBins
+
+
+def _append(path: str, rows: pd.DataFrame, partial: bool = False):
+    text = rows.to_csv(header=False, index=False)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        if partial:
+            # Leave the last row half-written; the next append completes it
+            cut = text.rfind("\n", 0, len(text) - 1) + 1 + 5
+            f.write(text[:cut])
+            return text[cut:]
+        f.write(text)
+    return ""
+
+
+def _same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    a = a.sort_index()
+    b = b.sort_index()
+    return a.index.equals(b.index) and np.allclose(a.to_numpy(dtype=float), b.to_numpy(dtype=float))
+
+
+# A narrowed hashtag ranking, checked against pandas on the full frame
+SEGMENT = {"Platform": ["TikTok"], "Content_Type": ["Video", "Reel"], "Region": ["India", "USA"]}
+
+
+def _segment_likes(df: pd.DataFrame) -> pd.DataFrame:
+    mask = np.logical_and.reduce([df[dim].isin(values) for dim, values in SEGMENT.items()])
+    likes = df[mask].groupby(df["Hashtag"].astype(str)[mask])["Likes"].mean()
+    return likes.to_frame()
+
+
+def _bin_means(bins: TrendBins) -> pd.DataFrame:
+    means = bins.series("Views", bins.platforms, bins.regions)
+    return means.astype({"Platform": str}).set_index(["Bin", "Platform"])
+
+
+def _sparse_bins(full: pd.DataFrame) -> bool:
+    # IDs far apart, later half first: storage follows the posts and arrival order doesn't matter
+    sparse = full[AGGREGATE_COLUMNS].assign(Post_Num=full["Post_Num"] * 100_003)
+    half = len(sparse) // 2
+    at_once, split = TrendBins(), TrendBins()
+    at_once.add(sparse)
+    split.add(sparse.iloc[half:])
+    split.add(sparse.iloc[:half])
+    return split.n_bins <= len(sparse) and _same(_bin_means(split), _bin_means(at_once))
+
+
+def _no_trailing_newline(workdir: str) -> bool:
+    # A static export's last row counts; one still missing fields waits for the rest of its line
+    path = os.path.join(workdir, "no_newline.csv")
+    text = generate(2).to_csv(index=False).rstrip("\n")
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    static = data.Dataset(path).n_rows == 2 and len(pd.read_csv(path)) == 2
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text[:text.rfind(",")])
+    partial = data.Dataset(path).n_rows == 1
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    ds = data.Dataset(path)
+    with open(path, "a", encoding="utf-8", newline="") as f:
+        f.write("\n" + generate(1, start=3).to_csv(index=False, header=False))
+    appended = ds.refresh() and ds.n_rows == 3
+    return static and partial and appended
+
+
+def main(initial_rows: int, appends: int) -> bool:
+    rng = np.random.default_rng(0)
+    with tempfile.TemporaryDirectory() as workdir:
+        data.CACHE_DIR = os.path.join(workdir, "cache")
+        path = os.path.join(workdir, "export.csv")
+        generate(initial_rows).to_csv(path, index=False)
+
+        ds = data.Dataset(path)
+        aggs = RunningAggregates(ds)
+        ds.refresh()
+        aggs.update()
+
+        next_id = initial_rows + 1
+        pending = ""
+        refresh_s = []
+        for i in range(appends):
+            n = int(rng.integers(1, 200))
+            rows = generate(n, seed=i, start=next_id)
+            next_id += n
+            if pending:
+                with open(path, "a", encoding="utf-8", newline="") as f:
+                    f.write(pending)
+            if i % 10 == 3:
+                # Replay a few already-ingested rows, as a retried export would
+                rows = pd.concat([generate(3, seed=i, start=next_id - n - 3), rows])
+            pending = _append(path, rows, partial=(i % 7 == 5))
+            t0 = time.perf_counter()
+            ds.refresh()
+            aggs.update()
+            refresh_s.append(time.perf_counter() - t0)
+        with open(path, "a", encoding="utf-8", newline="") as f:
+            f.write(pending)
+        ds.refresh()
+        aggs.update()
+
+        t0 = time.perf_counter()
+        full = data.parse_csv(path)
+        full = full[data.new_rows(full["Post_Num"].to_numpy(), 0)].reset_index(drop=True)
+        cube = build_cube(full[AGGREGATE_COLUMNS])
+        hashtags = full["Hashtag"].astype(str).value_counts()
+        bins = TrendBins()
+        bins.add(full[AGGREGATE_COLUMNS])
+        full_s = time.perf_counter() - t0
+
+        inc = ds.frame()
+        ok = {
+            "rows": len(inc) == len(full),
+            "frame": all((inc[c].astype(str).to_numpy() == full[c].astype(str).to_numpy()).all() for c in full.columns),
+            "cube": _same(aggs.cube, cube),
+            "hashtags": _same(aggs.hashtags.top(None).to_frame(), hashtags.rename("Count").to_frame()),
+            "bins": _same(_bin_means(aggs.bins), _bin_means(bins)),
+            "hashtag_segment": _same(aggs.hashtags.top(None, "Likes", SEGMENT).to_frame(), _segment_likes(full)),
+            "sparse_bins": _sparse_bins(full),
+            "no_trailing_newline": _no_trailing_newline(workdir),
+        }
+        print(f"rows={len(inc)} appends={appends} generation={ds.generation}")
+        print(f"incremental refresh: mean {np.mean(refresh_s) * 1000:.1f} ms, max {np.max(refresh_s) * 1000:.1f} ms")
+        print(f"full recompute:      {full_s * 1000:.1f} ms")
+        print("matches full recompute:", ok)
+        return all(ok.values())
+
+
+if __name__ == "__main__":
+    initial = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    n_appends = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    sys.exit(0 if main(initial, n_appends) else 1)
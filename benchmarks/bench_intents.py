@@ -0,0 +1,46 @@
+# Checks the intent parser against the query corpus, then times 100k parses
+#
+#   python benchmarks/bench_intents.py [n_queries]
+import json
+import os
+import sys
+import time
+from dataclasses import asdict
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from components.data import load_data
+from components.intents import Intent, parser_for
+
+CORPUS = os.path.join(os.path.dirname(__file__), "intent_corpus.jsonl")
+
+
+def check(parser, corpus) -> int:
+    failures = 0
+    for case in corpus:
+        expected = asdict(Intent(**case["expected"]))
+        got = asdict(parser.parse(case["query"]))
+        if got != expected:
+            failures += 1
+            print(f"MISMATCH {case['query']!r}\n  expected {expected}\n  got      {got}")
+    return failures
+
+
+if __name__ == "__main__":
+    n_queries = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    with open(CORPUS) as f:
+        corpus = [json.loads(line) for line in f]
+    parser = parser_for(load_data(columns=["Platform", "Region", "Content_Type"]))
+
+    failures = check(parser, corpus)
+    print(f"corpus: {len(corpus) - failures}/{len(corpus)} queries parsed as expected")
+
+    queries = [corpus[i % len(corpus)]["query"] for i in range(n_queries)]
+    t0 = time.perf_counter()
+    for q in queries:
+        parser.parse(q)
+    elapsed = time.perf_counter() - t0
+    print(f"parsed {n_queries} queries in {elapsed:.2f}s ({n_queries / elapsed:,.0f} queries/s)")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,98 @@
+# Cold/warm load time and peak RSS: CSV vs Feather vs Parquet
+#
+#   python benchmarks/bench_load.py 1000000 10000000
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing as mp
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_csv
+
+# Columns used by Content_Strategy.py (no Post_ID / Engagement_Level)
+PAGE_COLUMNS = ["Platform", "Hashtag", "Content_Type", "Region", "Views", "Likes", "Shares", "Comments"]
+
+
+def _peak_rss_mb() -> float:
+    # VmHWM is reset on exec; ru_maxrss is not, and would report the parent's peak
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _measure(fmt: str, csv_path: str, cache_dir: str, columns):
+    # Runs in a fresh process so peak RSS belongs to this load only
+    import pandas as pd
+    from components import data
+
+    data.CACHE_DIR = cache_dir
+    if fmt == "csv":
+        read = lambda: data.parse_csv(csv_path, columns)
+    elif fmt == "feather":
+        sidecar = data.convert(csv_path)  # already converted by _prepare: only hashes the CSV
+        read = lambda: data.read_columnar(sidecar, columns)
+    else:
+        parquet = os.path.join(cache_dir, "data.parquet")
+        read = lambda: pd.read_parquet(parquet, columns=columns)
+
+    rss_before = _peak_rss_mb()
+    t0 = time.perf_counter()
+    df = read()
+    cold = time.perf_counter() - t0
+    peak = _peak_rss_mb()
+    del df
+    t0 = time.perf_counter()
+    read()
+    warm = time.perf_counter() - t0
+    return {"cold_s": round(cold, 3), "warm_s": round(warm, 3),
+            "peak_rss_mb": round(peak, 1), "load_rss_mb": round(peak - rss_before, 1)}
+
+
+def _prepare(csv_path: str, cache_dir: str):
+    from components import data
+
+    data.CACHE_DIR = cache_dir
+    t0 = time.perf_counter()
+    data.convert(csv_path)
+    convert_s = time.perf_counter() - t0
+    data.parse_csv(csv_path).to_parquet(os.path.join(cache_dir, "data.parquet"))
+    return convert_s
+
+
+def run(n_rows: int, workdir: str):
+    csv_path = os.path.join(workdir, f"synthetic_{n_rows}.csv")
+    cache_dir = os.path.join(workdir, f"cache_{n_rows}")
+    os.makedirs(cache_dir, exist_ok=True)
+    write_csv(csv_path, n_rows)
+
+    ctx = mp.get_context("spawn")
+    with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+        convert_s = pool.submit(_prepare, csv_path, cache_dir).result()
+    print(json.dumps({"rows": n_rows, "csv_mb": round(os.path.getsize(csv_path) / 2**20, 1),
+                      "convert_s": round(convert_s, 3)}))
+
+    for columns in (None, PAGE_COLUMNS):
+        for fmt in ("csv", "feather", "parquet"):
+            with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                result = pool.submit(_measure, fmt, csv_path, cache_dir, columns).result()
+            print(json.dumps({"rows": n_rows, "format": fmt,
+                              "columns": "all" if columns is None else "page", **result}))
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000_000, 10_000_000]
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            run(n, workdir)
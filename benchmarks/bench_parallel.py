@@ -0,0 +1,116 @@
+# Parallel aggregation backend: checks every parallel path against the serial
+# one, then times each aggregation for 1-32 workers
+#
+#   python benchmarks/bench_parallel.py [rows] [process|thread] [workers ...]
+#
+# Speedups are bounded by the cores of the machine (os.cpu_count() is printed);
+# worker counts above it only measure the overhead of splitting and merging.
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate
+from components import parallel
+from components.charts import MAX_OUTLIERS, boxplot_summary
+from components.cube import CUBE_COLUMNS, METRICS, build_cube, engagement_rate
+from components.hashtags import HashtagIndex
+from components.trends import TrendBins
+
+WORKERS = [1, 2, 4, 8, 16, 32]
+REPEAT = 3
+
+
+def _frame(n_rows: int) -> pd.DataFrame:
+    # Dataset-like: categorical dimensions, Post_Num instead of Post_ID strings
+    df = generate(n_rows, seed=7).drop(columns="Post_ID")
+    dims = ["Platform", "Hashtag", "Content_Type", "Region", "Engagement_Level"]
+    df = df.astype({c: "category" for c in dims})
+    df["Post_Num"] = np.arange(1, n_rows + 1)
+    return df
+
+
+def _trend_bins(df) -> TrendBins:
+    bins = TrendBins()
+    bins.add(df)
+    return bins
+
+
+def _means(df):
+    frame = df[["Platform"] + METRICS[:-1]].assign(Engagement_Rate=engagement_rate(df))
+    return parallel.group_means(frame, "Platform", METRICS)
+
+
+CASES = {
+    "cube": lambda df: build_cube(df[CUBE_COLUMNS]),
+    "hashtag_index": lambda df: HashtagIndex().add(df),
+    "trend_bins": _trend_bins,
+    "group_means": _means,
+    "boxplot": lambda df: boxplot_summary(df, "Content_Type", "Likes"),
+}
+
+
+def _check(name: str, serial, result) -> bool:
+    if name == "cube":
+        return serial.index.equals(result.index) and np.allclose(serial.to_numpy(), result.to_numpy())
+    if name in ("hashtag_index", "trend_bins"):
+        return (np.array_equal(serial.count, result.count)
+                and all(np.allclose(serial.sums[m], result.sums[m]) for m in serial.metrics))
+    if name == "group_means":
+        return serial.index.equals(result.index) and np.allclose(serial.to_numpy(), result.to_numpy())
+    if name == "boxplot":
+        (a, _), (b, outliers) = serial, result
+        # Quartiles come from sketches: within their relative error of the exact ones
+        quartiles = np.allclose(a[["q1", "median", "q3"]], b[["q1", "median", "q3"]],
+                                rtol=2 * parallel.SKETCH_ACCURACY, atol=1)
+        whiskers = np.allclose(a[["whisker_low", "whisker_high"]], b[["whisker_low", "whisker_high"]],
+                               rtol=2 * parallel.SKETCH_ACCURACY, atol=1)
+        return (quartiles and whiskers and list(a["count"]) == list(b["count"])
+                and len(outliers) <= MAX_OUTLIERS)
+    raise ValueError(name)
+
+
+def main(n_rows: int, kind: str, workers: list) -> bool:
+    df = _frame(n_rows)
+    print(f"rows={n_rows:,} backend={kind} cpu_count={os.cpu_count()}")
+
+    parallel.configure(1)
+    serial = {name: fn(df) for name, fn in CASES.items()}
+    timings = {}
+    ok = True
+    for w in workers:
+        parallel.configure(w, kind, min_rows=0)
+        for name, fn in CASES.items():
+            fn(df)  # starts the pool and imports the kernels in every worker
+            times = []
+            for _ in range(REPEAT):
+                t0 = time.perf_counter()
+                fn(df)
+                times.append((time.perf_counter() - t0) * 1000)
+            timings[name, w] = min(times)
+        checks = {name: _check(name, serial[name], fn(df)) for name, fn in CASES.items()}
+        if not all(checks.values()):
+            print(f"workers={w}: MISMATCH {checks}")
+            ok = False
+    parallel.configure(1)
+
+    print(f"{'case':15s}" + "".join(f"{w:>12}" for w in workers))
+    for name in CASES:
+        base = timings[name, workers[0]]
+        cells = "".join(f"{timings[name, w]:9.0f} ms" if w == workers[0]
+                        else f"{timings[name, w]:7.0f} x{base / timings[name, w]:.1f}" for w in workers)
+        print(f"{name:15s}{cells}")
+    print(f"matches serial: {ok}")
+    return ok
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    kind = sys.argv[2] if len(sys.argv) > 2 else "process"
+    workers = [int(w) for w in sys.argv[3:]] or WORKERS
+    sys.exit(0 if main(rows, kind, workers) else 1)
@@ -0,0 +1,85 @@
+# Bytes each page sends to the browser per chart and table
+#
+#   python benchmarks/bench_payload.py [rows]
+#
+# Runs every page headlessly with Streamlit's AppTest against a synthetic
+# dataset and reports the serialized size of each chart/dataframe element (the
+# trend chart must stay under TREND_MAX_KIB however many rows there are), then
+# checks that each page still renders when a sidebar multiselect is emptied.
+import logging
+import os
+import sys
+import tempfile
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+PAGES = ["pages/Trend_Overview.py", "pages/Platform_Insights.py", "pages/Content_Strategy.py"]
+MEASURED = {"vega_lite_chart", "arrow_data_frame", "dataframe"}
+TREND_CHART = "Trend Change by Platform"
+TREND_MAX_KIB = 256
+
+
+def _elements(node):
+    children = getattr(node, "children", None)
+    if isinstance(children, dict):
+        for child in children.values():
+            yield child
+            yield from _elements(child)
+
+
+def measure(page: str):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600).run()
+    if at.checkbox:
+        # Trend Overview: include the raw data table
+        at.checkbox[0].check().run()
+    title = ""
+    results = []
+    for el in _elements(at.main):
+        if el.type == "subheader":
+            title = el.value
+        elif el.type in MEASURED:
+            results.append((title, el.type, el.proto.ByteSize()))
+    return results
+
+
+def check_empty_selection(page: str) -> list:
+    # Sidebar multiselects whose emptying makes the page raise
+    from streamlit.testing.v1 import AppTest
+
+    failures = []
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600).run()
+    for i in range(len(at.sidebar.multiselect)):
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600).run()
+        widget = at.sidebar.multiselect[i]
+        widget.set_value([]).run()
+        if at.exception:
+            failures.append(f"{widget.label}: {at.exception[0].value}")
+    return failures
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    logging.disable(logging.WARNING)
+    with tempfile.TemporaryDirectory() as workdir:
+        from benchmarks.synthetic import write_csv
+
+        os.environ["TRENDS_CSV"] = write_csv(os.path.join(workdir, "synthetic.csv"), rows)
+        print(f"rows={rows}")
+        trend_kib = 0.0
+        for page in PAGES:
+            results = measure(page)
+            print(f"{page}: {sum(b for _, _, b in results) / 1024:,.1f} KiB total")
+            for title, kind, size in results:
+                print(f"  {size / 1024:10,.1f} KiB  {kind:18s} {title}")
+                if title == TREND_CHART:
+                    trend_kib = max(trend_kib, size / 1024)
+        trend_ok = 0 < trend_kib <= TREND_MAX_KIB
+        print(f"{TREND_CHART}: {trend_kib:,.1f} KiB ({'ok' if trend_ok else 'OVER'} {TREND_MAX_KIB} KiB)")
+        failures = {page: check_empty_selection(page) for page in PAGES}
+        for page, errors in failures.items():
+            print(f"{page}: empty selection {'FAILS: ' + '; '.join(errors) if errors else 'ok'}")
+    sys.exit(1 if not trend_ok or any(failures.values()) else 0)
@@ -0,0 +1,87 @@
+# Cube rollups against pandas: checks rollup() means, sums, standard
+# deviations and counts against groupby on the raw rows for several filters
+# and groupings (an empty selection included), then times both. The small
+# default size leaves single-post groups, whose std is undefined.
+#
+#   python benchmarks/bench_rollup.py [rows ...]
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate
+from components.cube import DIMENSIONS, METRICS, build_cube, engagement_rate, rollup
+
+FILTERS = {
+    "all rows": {},
+    "two platforms": {"Platform": ["TikTok", "YouTube"]},
+    "platform x region": {"Platform": ["Instagram"], "Region": ["USA", "UK", "Japan"]},
+    "three dimensions": {"Region": ["India"], "Content_Type": ["Reel", "Video"], "Engagement_Level": ["High"]},
+    "empty selection": {"Platform": []},
+}
+GROUPINGS = [None, "Platform", "Engagement_Level", ["Region", "Content_Type"]]
+STATS = ["mean", "sum", "std", "count"]
+REPEAT = 5
+
+
+def _frame(n_rows: int) -> pd.DataFrame:
+    df = generate(n_rows, seed=5).astype({d: "category" for d in DIMENSIONS})
+    return df.assign(Engagement_Rate=engagement_rate(df))
+
+
+def expected(df: pd.DataFrame, by, filters: dict, stat: str):
+    # What the pages computed before the cube: filter the rows, then group them
+    mask = np.ones(len(df), dtype=bool)
+    for dim, selected in filters.items():
+        mask &= df[dim].isin(selected).to_numpy()
+    rows = df[mask]
+    if by is None:
+        return len(rows) if stat == "count" else rows[METRICS].agg(stat)
+    grouped = rows.groupby(by, observed=True)
+    return grouped.size().rename("Count") if stat == "count" else grouped[METRICS].agg(stat)
+
+
+def _same(result, reference) -> bool:
+    if isinstance(reference, int):
+        return result == reference
+    if isinstance(reference, pd.DataFrame) or reference.index.nlevels > 1 or reference.name == "Count":
+        result, reference = result.sort_index(), reference.sort_index()
+        if not result.index.equals(reference.index):
+            return False
+    return np.allclose(np.asarray(result, dtype=float), np.asarray(reference, dtype=float), rtol=1e-6, equal_nan=True)
+
+
+def main(n_rows: int) -> bool:
+    df = _frame(n_rows)
+    cube = build_cube(df)
+    failures = []
+    for name, filters in FILTERS.items():
+        for by in GROUPINGS:
+            for stat in STATS:
+                if not _same(rollup(cube, by, filters, stat=stat), expected(df, by, filters, stat)):
+                    failures.append(f"{name} / by={by} / {stat}")
+    print(f"rows={n_rows:,} cube cells={len(cube):,} "
+          f"checks={len(FILTERS) * len(GROUPINGS) * len(STATS)} failures={len(failures)}")
+    for failure in failures:
+        print("MISMATCH", failure)
+
+    filters = FILTERS["two platforms"]
+    for label, fn in (("rollup", lambda: rollup(cube, "Region", filters)),
+                      ("pandas groupby", lambda: expected(df, "Region", filters, "mean"))):
+        times = []
+        for _ in range(REPEAT):
+            t0 = time.perf_counter()
+            fn()
+            times.append((time.perf_counter() - t0) * 1000)
+        print(f"  {label:15s} {min(times):8.2f} ms  (mean by region, two platforms)")
+    return not failures
+
+
+if __name__ == "__main__":
+    sizes = [int(n) for n in sys.argv[1:]] or [200_000, 60]
+    sys.exit(0 if all([main(n) for n in sizes]) else 1)
@@ -0,0 +1,136 @@
+# Load test: N concurrent sessions driving the sidebar filters
+#
+#   python benchmarks/bench_sessions.py 1000000 --sessions 1 8 32 --reruns 20
+#
+# Each session is a headless AppTest of one page (round-robin over the
+# filtered pages) in its own thread of one server process, like Streamlit's
+# own sessions. Every rerun picks a random sidebar selection. Reports p50/p95
+# rerun latency and the process RSS with every session's state alive, plus
+# the private memory of chatbot engine workers that attach the shared
+# dataset versus ones that load it themselves.
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import write_csv
+
+PAGES = ["pages/Trend_Overview.py", "pages/Content_Strategy.py", "pages/chatbot_assitant.py"]
+
+# AppTest swaps a process-global Runtime in and out around every run, so runs
+# take turns; latency is measured once a run has the runtime, wall time and
+# reruns/s cover the whole load.
+_runtime = threading.Lock()
+
+
+def _memory_mb() -> dict:
+    # RssAnon is private to the process; RssShmem counts mapped shared memory
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key = line.split(":")[0]
+            if key in ("VmRSS", "RssAnon", "RssShmem"):
+                out[key] = round(int(line.split()[1]) / 1024, 1)
+    return out
+
+
+def _session(page: str, reruns: int, seed: int, latencies: list, errors: list):
+    from streamlit.testing.v1 import AppTest
+
+    rng = random.Random(seed)
+    with _runtime:
+        at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=600).run()
+    for _ in range(reruns):
+        widget = rng.choice(list(at.sidebar.multiselect))
+        options = widget.options
+        widget.set_value(rng.sample(options, rng.randint(1, len(options))))
+        with _runtime:
+            t0 = time.perf_counter()
+            at.run()
+            latencies.append(time.perf_counter() - t0)
+        errors.extend(e.value for e in at.exception)
+
+
+def _load_test(n_sessions: int, reruns: int) -> dict:
+    # Fresh process per session count, so RSS belongs to this run only
+    logging.disable(logging.WARNING)
+    latencies, errors = [], []
+    threads = [threading.Thread(target=_session, args=(PAGES[i % len(PAGES)], reruns, i, latencies, errors))
+               for i in range(n_sessions)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - t0
+    ms = np.array(latencies) * 1000
+    from components.filters import get_filter_index
+
+    # Filtered views cached for all sessions: row positions, not frames
+    views_mb = sum(rows.nbytes for rows in get_filter_index()._views.values()) / 2**20
+    return {"sessions": n_sessions, "reruns": len(ms), "seconds": round(seconds, 1),
+            "reruns_per_s": round(len(ms) / seconds, 1),
+            "p50_ms": round(float(np.percentile(ms, 50)), 1), "p95_ms": round(float(np.percentile(ms, 95)), 1),
+            "errors": len(errors), "views_mb": round(views_mb, 1), **_memory_mb()}
+
+
+def _worker_memory(mode: str, spec: dict) -> dict:
+    from components.data import get_dataset
+    from components.engine import ENGINE_COLUMNS, ChatEngine
+    from components.shared import attach
+
+    if mode == "shared":
+        engine = ChatEngine(filters={"Region": ["UK", "USA"]}, df=attach(spec))
+    else:
+        engine = ChatEngine(filters={"Region": ["UK", "USA"]}, df=get_dataset().frame(ENGINE_COLUMNS))
+    engine.answer("best platform for views")
+    time.sleep(0.5)  # keep every worker alive until all have been measured
+    return _memory_mb()
+
+
+def _workers(n_workers: int) -> list:
+    from components.engine import ENGINE_COLUMNS
+    from components.shared import get_shared
+
+    spec = get_shared(columns=ENGINE_COLUMNS).spec
+    results = []
+    for mode in ("load", "shared"):
+        with ProcessPoolExecutor(n_workers, mp_context=mp.get_context("spawn")) as pool:
+            per_worker = list(pool.map(_worker_memory, [mode] * n_workers, [spec] * n_workers))
+        results.append({"workers": n_workers, "mode": mode,
+                        "private_mb_per_worker": round(np.mean([m["RssAnon"] for m in per_worker]), 1),
+                        "shared_mb_per_worker": round(np.mean([m["RssShmem"] for m in per_worker]), 1)})
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("rows", nargs="?", type=int, default=1_000_000)
+    parser.add_argument("--sessions", nargs="+", type=int, default=[1, 8, 32])
+    parser.add_argument("--reruns", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        # Spawned processes import components.data fresh and pick these up
+        os.environ["TRENDS_CSV"] = write_csv(os.path.join(workdir, "synthetic.csv"), args.rows)
+        print(f"rows={args.rows}")
+        for n in args.sessions:
+            with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                print(json.dumps(pool.submit(_load_test, n, args.reruns).result()))
+        with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+            for result in pool.submit(_workers, args.workers).result():
+                print(json.dumps(result))
@@ -0,0 +1,127 @@
+# Loading a year of daily exports: parallel merge vs reading and concatenating
+# the files serially with pandas, then the cached dataset cold and after a
+# restart; checks the merge (de-duplication, unified categories) and refresh
+#
+#   python benchmarks/bench_sources.py [files] [rows_per_file] [workers]
+#
+# Speedups are bounded by the cores of the machine (os.cpu_count() is printed).
+import os
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.synthetic import generate
+from components import data, sources
+from components.data import DTYPES, post_numbers
+
+# Share of each day's posts exported again the next day, with updated metrics
+REPEATED = 0.02
+REPEAT = 3
+
+
+def write_exports(directory: str, n_files: int, rows_per_file: int, seed: int = 42) -> list:
+    paths = []
+    carried = None
+    for day in range(n_files):
+        df = generate(rows_per_file, seed=seed + day, start=day * rows_per_file + 1)
+        if carried is not None:
+            df = pd.concat([carried, df], ignore_index=True)
+        carried = df.sample(frac=REPEATED, random_state=day).assign(Views=lambda d: d["Views"] + 1)
+        date = pd.Timestamp("2025-01-01") + pd.Timedelta(days=day)
+        path = os.path.join(directory, f"export_{date:%Y-%m-%d}.csv")
+        df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def serial_concat(paths: list) -> pd.DataFrame:
+    return pd.concat([pd.read_csv(path, dtype=DTYPES) for path in paths], ignore_index=True)
+
+
+def serial_merge(paths: list) -> pd.DataFrame:
+    # The same result as read_exports, built the straightforward way
+    df = serial_concat(paths)
+    df = df[~df["Post_ID"].duplicated(keep="last")]
+    df = df.assign(Post_Num=post_numbers(df["Post_ID"])).sort_values("Post_Num", kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _time(fn) -> float:
+    times = []
+    for _ in range(REPEAT):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def _same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    # Same rows and values; category order may differ
+    return list(a.columns) == list(b.columns) and all(
+        np.array_equal(a[c].astype(str).to_numpy(), b[c].astype(str).to_numpy()) for c in a.columns)
+
+
+def check_refresh(directory: str, paths: list) -> bool:
+    # A new day is appended; a new file repeating a post reloads so its values win
+    ds = sources.SourceSet(directory)
+    generation, n_rows = ds.version
+    extra = generate(100, seed=1, start=10**9)
+    extra.to_csv(os.path.join(directory, "export_9999-01-01.csv"), index=False)
+    appended = ds.refresh() and ds.version == (generation, n_rows + 100)
+    merged = sources.read_exports(sources.list_sources(directory))
+    matches = _same(ds.frame(list(merged.columns)), merged)
+    repeat = pd.read_csv(paths[0], dtype=DTYPES).head(1).assign(Views=-1)
+    repeat.to_csv(os.path.join(directory, "export_9999-01-02.csv"), index=False)
+    reloaded = ds.refresh() and ds.version[0] == generation + 1
+    latest = ds.frame(["Post_ID", "Views"]).set_index("Post_ID").at[repeat["Post_ID"][0], "Views"] == -1
+    return appended and matches and reloaded and latest
+
+
+def main(n_files: int, rows_per_file: int, workers: int) -> bool:
+    with tempfile.TemporaryDirectory() as workdir:
+        exports = os.path.join(workdir, "exports")
+        os.makedirs(exports)
+        data.CACHE_DIR = os.path.join(workdir, "cache")
+        paths = write_exports(exports, n_files, rows_per_file)
+        size_mb = sum(os.path.getsize(p) for p in paths) / 2**20
+        print(f"files={n_files} rows/file={rows_per_file:,} ({size_mb:.0f} MB) "
+              f"workers={workers} cpu_count={os.cpu_count()}")
+
+        expected = serial_merge(paths)
+        merged = sources.read_exports(paths, workers=workers)
+        ok = _same(merged, expected)
+        categories = all(isinstance(merged[c].dtype, pd.CategoricalDtype) for c in data.CATEGORY_COLUMNS)
+        print(f"rows {len(merged):,} after de-duplication; matches serial merge: {ok}; "
+              f"categorical: {categories}")
+
+        timings = {
+            "pandas, serial concat": _time(lambda: serial_concat(paths)),
+            "pandas, serial concat + de-dup": _time(lambda: serial_merge(paths)),
+            "read_exports, 1 worker": _time(lambda: sources.read_exports(paths, workers=1)),
+        }
+        if workers > 1:
+            timings[f"read_exports, {workers} workers"] = _time(lambda: sources.read_exports(paths, workers=workers))
+        t0 = time.perf_counter()
+        sources.SourceSet(exports).frame()
+        timings["dataset, cold (merge + sidecar)"] = time.perf_counter() - t0
+        timings["dataset, restart (sidecar)"] = _time(lambda: sources.SourceSet(exports).frame())
+        base = timings["pandas, serial concat"]
+        for name, seconds in timings.items():
+            print(f"  {name:34s} {seconds:8.3f} s  x{base / seconds:.1f}")
+
+        refresh = check_refresh(exports, paths)
+        print(f"refresh: new day appended, repeated post reloaded: {refresh}")
+    return ok and categories and refresh
+
+
+if __name__ == "__main__":
+    n_files = int(sys.argv[1]) if len(sys.argv) > 1 else 365
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 5_000
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else sources.WORKERS
+    sys.exit(0 if main(n_files, rows, workers) else 1)
@@ -0,0 +1,44 @@
+# Streaming mode: peak memory must stay flat as the file grows
+#
+#   python benchmarks/bench_streaming.py 1000000 10000000 50000000
+import json
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_load import _peak_rss_mb
+from benchmarks.synthetic import write_csv
+
+
+def _measure(path: str, chunk_size: int):
+    # Fresh process per file so the peak belongs to this run only
+    from components.streaming import stream_stats
+
+    before = _peak_rss_mb()
+    t0 = time.perf_counter()
+    stats = stream_stats(path, chunk_size)
+    elapsed = time.perf_counter() - t0
+    return {"rows": stats.rows, "seconds": round(elapsed, 2),
+            "rows_per_s": round(stats.rows / elapsed), "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "stream_rss_mb": round(_peak_rss_mb() - before, 1), "bin_width": stats.bins.width,
+            "top_hashtags": stats.top_hashtags(3).to_dict()}
+
+
+if __name__ == "__main__":
+    sizes = [int(a) for a in sys.argv[1:]] or [1_000_000, 10_000_000, 50_000_000]
+    chunk = 250_000
+    ctx = mp.get_context("spawn")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n in sizes:
+            path = write_csv(os.path.join(workdir, "synthetic.csv"), n)
+            with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+                result = pool.submit(_measure, path, chunk).result()
+            print(json.dumps({"csv_mb": round(os.path.getsize(path) / 2**20), "chunk_size": chunk, **result}))
+            os.remove(path)
@@ -0,0 +1,296 @@
+# Headless performance suite: every page's compute path at 10k / 1M / 10M rows
+#
+#   python benchmarks/suite.py --record                 # write the baseline
+#   python benchmarks/suite.py                          # compare, exit 1 on regression
+#   python benchmarks/suite.py --sizes 10000 1000000 --repeat 5
+#
+# Pages are rerun with Streamlit's AppTest, so timings include chart specs and
+# serialization. Each size runs in a fresh process against a synthetic export
+# (fixed seed, kept in .cache/bench/ between runs). The process's peak RSS is
+# reset before each case (Linux), so each case reports its own peak and how far
+# it rose above the RSS the case started from; regressions compare the rise.
+import argparse
+import json
+import logging
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.bench_load import _peak_rss_mb
+from benchmarks.synthetic import write_csv
+
+SIZES = [10_000, 1_000_000, 10_000_000]
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+DATA_DIR = os.path.join(ROOT, ".cache", "bench")
+CORPUS = os.path.join(os.path.dirname(__file__), "intent_corpus.jsonl")
+
+# A case regresses when its fastest run gets slower by more than TIME_TOLERANCE
+# (and at least MIN_DELTA_MS), or its peak RSS grows by more than
+# MEMORY_TOLERANCE. The fastest run is the least disturbed by other load on
+# the machine; medians are recorded alongside.
+TIME_TOLERANCE = 0.25
+MIN_DELTA_MS = 2.0
+MEMORY_TOLERANCE = 0.15
+MIN_DELTA_MB = 8.0
+
+
+def _rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _reset_peak_rss() -> bool:
+    # Linux: writing 5 to clear_refs resets VmHWM to the current RSS
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _app(page: str):
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(os.path.join(ROOT, "pages", page), default_timeout=3600)
+
+
+def _rerun(at) -> float:
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = (time.perf_counter() - t0) * 1000
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return elapsed
+
+
+def case_load(repeat: int) -> list:
+    # Cold start of the shared state every page reads: dataset, running aggregates, filter bitmaps
+    from components.data import get_dataset
+    from components.filters import get_filter_index
+    from components.ingest import load_aggregates
+
+    t0 = time.perf_counter()
+    get_dataset().frame()
+    load_aggregates()
+    get_filter_index()
+    return [(time.perf_counter() - t0) * 1000]
+
+
+def case_trend_binning(repeat: int) -> list:
+    at = _app("Trend_Overview.py")
+    at.run()
+    times = []
+    for _ in range(repeat):
+        for bin_size, window in ((50, 1), (250, 1), (1000, 1), (50, 10)):
+            at.sidebar.slider[0].set_value(bin_size)
+            at.sidebar.slider[1].set_value(window)
+            times.append(_rerun(at))
+    return times
+
+
+def case_platform_metric_switch(repeat: int) -> list:
+    at = _app("Platform_Insights.py")
+    at.run()
+    times = []
+    for _ in range(repeat):
+        for metric in at.sidebar.selectbox[0].options:
+            at.sidebar.selectbox[0].set_value(metric)
+            times.append(_rerun(at))
+    return times
+
+
+def case_selection_revisit(repeat: int) -> list:
+    # Toggling back and forth between two selections: charts come from the cache
+    at = _app("Platform_Insights.py")
+    at.run()
+    regions = at.sidebar.multiselect[0].options
+    times = []
+    for _ in range(repeat):
+        for selection in (regions[:1], regions):
+            at.sidebar.multiselect[0].set_value(selection)
+            times.append(_rerun(at))
+    return times
+
+
+def case_content_heatmap(repeat: int) -> list:
+    # The region x content type rollup alone, for random sidebar selections
+    from components.cube import rollup
+    from components.ingest import load_aggregates
+
+    cube = load_aggregates().cube
+    platforms = list(cube.index.levels[0])
+    content_types = list(cube.index.levels[2])
+    rng = random.Random(0)
+    times = []
+    for _ in range(repeat * 20):
+        filters = {"Platform": rng.sample(platforms, rng.randint(1, len(platforms))),
+                   "Content_Type": rng.sample(content_types, rng.randint(1, len(content_types)))}
+        t0 = time.perf_counter()
+        rollup(cube, ["Region", "Content_Type"], filters, metrics="Views")
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def case_content_strategy_rerun(repeat: int) -> list:
+    at = _app("Content_Strategy.py")
+    at.run()
+    rng = random.Random(0)
+    times = []
+    for _ in range(repeat * 4):
+        widget = at.sidebar.multiselect[rng.randrange(2)]
+        widget.set_value(rng.sample(widget.options, rng.randint(1, len(widget.options))))
+        times.append(_rerun(at))
+    return times
+
+
+def case_chatbot_first_answer(repeat: int) -> list:
+    # A new sidebar selection: filter, build the context, answer
+    from components.engine import ChatEngine
+
+    rng = random.Random(0)
+    regions = ["USA", "UK", "India", "Brazil", "Japan", "Germany", "Canada", "Australia"]
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        ChatEngine(filters={"Region": rng.sample(regions, rng.randint(1, 7))}).answer("Top 3 platforms by views")
+        times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def case_chatbot_first_render(repeat: int) -> list:
+    # Chatbot page rerun after a sidebar change: the selection's context is prepared in the background
+    at = _app("chatbot_assitant.py")
+    at.run()
+    regions = at.sidebar.multiselect[1].options
+    times = []
+    for _ in range(repeat):
+        for selection in (regions[:1], regions[1:3], regions):
+            at.sidebar.multiselect[1].set_value(selection)
+            times.append(_rerun(at))
+    return times
+
+
+def case_chatbot_responses(repeat: int) -> list:
+    # Per-message time once the selection's context is warm
+    from components.engine import ChatEngine
+
+    with open(CORPUS) as f:
+        queries = [json.loads(line)["query"] for line in f]
+    engine = ChatEngine()
+    engine.answer_many(queries)
+    times = []
+    for _ in range(repeat):
+        for query in queries:
+            t0 = time.perf_counter()
+            engine.answer(query)
+            times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+CASES = {name[len("case_"):]: fn for name, fn in globals().items() if name.startswith("case_")}
+
+
+def _run_size(path: str, repeat: int, cases) -> dict:
+    # Runs in a fresh process: TRENDS_CSV is set by the parent before spawning
+    logging.disable(logging.WARNING)
+    from components import data
+
+    data.convert(path, data.line_end(path))  # columnar sidecar, outside the timings
+    results = {}
+    for name in cases:
+        # Without a reset the peak is that of every case so far: no rise is reported
+        reset = _reset_peak_rss()
+        before = _rss_mb() if reset else None
+        times = np.array(CASES[name](repeat))
+        peak = _peak_rss_mb()
+        results[name] = {"min_ms": round(float(times.min()), 3), "ms": round(float(np.median(times)), 3),
+                         "max_ms": round(float(times.max()), 3),
+                         "runs": len(times), "peak_rss_mb": round(peak, 1),
+                         "rss_rise_mb": round(peak - before, 1) if reset else None}
+    return results
+
+
+def _dataset(n_rows: int, seed: int) -> str:
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"synthetic_{n_rows}_{seed}.csv")
+    if not os.path.exists(path):
+        write_csv(path + ".tmp", n_rows, seed=seed)
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def compare(baseline: dict, results: dict) -> list:
+    """Cases that got slower or bigger than the baseline, as printable lines."""
+    regressions = []
+    for size, cases in results.items():
+        for name, now in cases.items():
+            base = baseline.get(size, {}).get(name)
+            if base is None:
+                continue
+            if now["min_ms"] > base["min_ms"] * (1 + TIME_TOLERANCE) and now["min_ms"] - base["min_ms"] > MIN_DELTA_MS:
+                regressions.append(f"{size:>10} {name}: fastest run {base['min_ms']:.1f} -> {now['min_ms']:.1f} ms")
+            rise, base_rise = now.get("rss_rise_mb"), base.get("rss_rise_mb")
+            if rise is None or base_rise is None:
+                continue  # a peak shared with earlier cases says nothing about this one
+            if rise > base_rise * (1 + MEMORY_TOLERANCE) and rise - base_rise > MIN_DELTA_MB:
+                regressions.append(f"{size:>10} {name}: RSS rise {base_rise:.0f} -> {rise:.0f} MB")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Headless performance suite with a regression check.")
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--record", action="store_true", help="write the results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = {}
+    ctx = mp.get_context("spawn")
+    for n in args.sizes:
+        os.environ["TRENDS_CSV"] = _dataset(n, args.seed)
+        with ProcessPoolExecutor(1, mp_context=ctx) as pool:
+            results[str(n)] = pool.submit(_run_size, os.environ["TRENDS_CSV"], args.repeat, args.cases).result()
+        for name, r in results[str(n)].items():
+            print(f"{n:>10} {name:26s} {r['min_ms']:10.1f} ms min  {r['ms']:10.1f} ms median  "
+                  f"(max {r['max_ms']:.1f}, {r['runs']} runs)  "
+                  f"peak RSS {r['peak_rss_mb']:.0f} MB"
+                  + (f" (+{r['rss_rise_mb']:.0f} MB)" if r["rss_rise_mb"] is not None else ""))
+
+    if args.record:
+        recorded = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                recorded = json.load(f)
+        recorded.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(recorded, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"no baseline at {args.baseline}; run with --record first")
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(json.load(f), results)
+    for line in regressions:
+        print("REGRESSION", line)
+    print(f"{len(regressions)} regression(s) against {args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Schema and category mix are taken from the shipped export, whatever TRENDS_CSV says
+SAMPLE_CSV = os.path.join(ROOT, "Viral_Social_Media_Trends.csv")
+
+
+def _frequencies(df: pd.DataFrame, col: str):
+    counts = df[col].value_counts()
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+
+def generate(n_rows: int, seed: int = 42, start: int = 1) -> pd.DataFrame:
+    # Same schema and category mix as the shipped CSV, at any scale
+    sample = pd.read_csv(SAMPLE_CSV)
+    rng = np.random.default_rng(seed)
+    out = {"Post_ID": "Post_" + pd.Series(np.arange(start, start + n_rows)).astype(str)}
+    for col in ["Platform", "Hashtag", "Content_Type", "Region"]:
+        values, p = _frequencies(sample, col)
+        out[col] = rng.choice(values, size=n_rows, p=p)
+    for col in ["Views", "Likes", "Shares", "Comments"]:
+        out[col] = rng.integers(sample[col].min(), sample[col].max() + 1, size=n_rows)
+    values, p = _frequencies(sample, "Engagement_Level")
+    out["Engagement_Level"] = rng.choice(values, size=n_rows, p=p)
+    return pd.DataFrame(out)
+
+
+def write_csv(path: str, n_rows: int, seed: int = 42, chunk_size: int = 1_000_000) -> str:
+    # Written in chunks so 10M+ row files don't need to fit in memory at once
+    written = 0
+    while written < n_rows:
+        n = min(chunk_size, n_rows - written)
+        chunk = generate(n, seed=seed + written, start=written + 1)
+        chunk.to_csv(path, mode="w" if written == 0 else "a", header=written == 0, index=False)
+        written += n
+    return path
+
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    target = sys.argv[2] if len(sys.argv) > 2 else f"synthetic_{rows}.csv"
+    seed = int(sys.argv[3]) if len(sys.argv) > 3 else 42
+    print(write_csv(target, rows, seed=seed))
@@ -0,0 +1,162 @@
+import threading
+from collections import OrderedDict
+from functools import cached_property
+import pandas as pd
+
+from components.bootstrap import Bootstrap
+from components.cube import engagement_rate
+from components.data import METRIC_COLUMNS
+from components.hashtags import HASHTAG_COLUMNS, HashtagIndex, narrow
+from components.intents import IntentParser, parser_for
+from components.parallel import group_means, means
+
+# Entity name used by the chatbot -> column it groups by
+ENTITY_COLUMNS = {"platform": "Platform", "content": "Content_Type", "region": "Region"}
+
+# Filter combinations kept alive at once
+MAX_CONTEXTS = 32
+
+# Answers remembered per context, for repeated questions
+MAX_ANSWERS = 256
+
+# Aggregates most questions read, computed ahead of the first question
+PRECOMPUTED = ("avg_platform", "avg_content", "avg_region", "overall", "top_hashtags")
+
+
+class AnalyticsContext:
+    """Aggregates of one filtered dataframe, each computed on first use and memoized.
+
+    `rows` holds the positions of the selected rows of `df` (None: all of them),
+    so a context can sit on the shared dataset frame: filtered columns are only
+    materialized while an aggregate is computed, and only the results are kept.
+    Hashtag rankings come from `hashtags`, a HashtagIndex of the whole dataset
+    narrowed to the `filters` selection; without one, an index of the
+    selected rows is built on first use.
+    """
+
+    def __init__(self, df: pd.DataFrame, rows=None, hashtags: HashtagIndex = None, filters=None):
+        self.df = df
+        self.rows = rows
+        self.filters = filters or {}
+        self._hashtags = hashtags
+        self._bootstraps = {}
+        self._answers = OrderedDict()
+        # Sessions on the same selection share the context: the answer memo is
+        # filled from the chat worker threads
+        self._lock = threading.Lock()
+
+    def column(self, col: str) -> pd.Series:
+        values = self.df[col]
+        return values if self.rows is None else values.take(self.rows)
+
+    def frame(self, columns) -> pd.DataFrame:
+        # Selected rows of `columns`, with Engagement_Rate computed on request
+        # (its input metrics come along)
+        base = [c for c in columns if c != "Engagement_Rate"]
+        if "Engagement_Rate" in columns:
+            base += [c for c in METRIC_COLUMNS if c not in base]
+        df = pd.DataFrame({c: self.column(c) for c in base}, copy=False)
+        if "Engagement_Rate" in columns:
+            df["Engagement_Rate"] = engagement_rate(df)
+        return df
+
+    @cached_property
+    def n_rows(self) -> int:
+        return len(self.df) if self.rows is None else len(self.rows)
+
+    @cached_property
+    def num_cols(self) -> list:
+        return [c for c in self.df.columns if pd.api.types.is_numeric_dtype(self.df[c])] + ["Engagement_Rate"]
+
+    @cached_property
+    def avg_platform(self) -> pd.DataFrame:
+        return self._average("Platform")
+
+    @cached_property
+    def avg_content(self) -> pd.DataFrame:
+        return self._average("Content_Type")
+
+    @cached_property
+    def avg_region(self) -> pd.DataFrame:
+        return self._average("Region")
+
+    @cached_property
+    def hashtag_index(self) -> HashtagIndex:
+        if self._hashtags is not None:
+            return self._hashtags
+        return HashtagIndex().add(self.frame(HASHTAG_COLUMNS))
+
+    @cached_property
+    def top_hashtags(self) -> pd.Series:
+        return self.hashtags(None)
+
+    def hashtags(self, k: int = 5, by: str = "count", filters=None) -> pd.Series:
+        # Best k hashtags of the selection, optionally narrowed further by `filters`
+        return self.hashtag_index.top(k, by, narrow(self.filters, filters))
+
+    @cached_property
+    def overall(self) -> pd.Series:
+        return means(self.frame(self.num_cols))
+
+    @cached_property
+    def platforms(self) -> list:
+        return self.column("Platform").unique().tolist()
+
+    @cached_property
+    def parser(self) -> IntentParser:
+        return parser_for(self.df)
+
+    def bootstrap(self, col: str, metric: str) -> Bootstrap:
+        # Confidence intervals of `metric`'s mean per group of `col`, memoized like the aggregates
+        boot = self._bootstraps.get((col, metric))
+        if boot is None:
+            rows = self.frame([col, metric])
+            boot = self._bootstraps[col, metric] = Bootstrap(rows[metric], rows[col])
+        return boot
+
+    def precompute(self) -> "AnalyticsContext":
+        for name in PRECOMPUTED:
+            getattr(self, name)
+        return self
+
+    def answer(self, key):
+        with self._lock:
+            return self._answers.get(key)
+
+    def remember(self, key, answer: str):
+        # Oldest first out once full
+        with self._lock:
+            self._answers[key] = answer
+            while len(self._answers) > MAX_ANSWERS:
+                self._answers.popitem(last=False)
+
+    def averages(self, entity: str) -> pd.DataFrame:
+        return {"platform": self.avg_platform,
+                "content": self.avg_content,
+                "region": self.avg_region}[entity]
+
+    def _average(self, col: str) -> pd.DataFrame:
+        return group_means(self.frame([col] + self.num_cols), col, self.num_cols)
+
+
+_contexts = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_context(key, build) -> AnalyticsContext:
+    # `key` identifies the filter selection (and dataset version); `build` returns
+    # the filtered dataframe, or a tuple of AnalyticsContext arguments, and is
+    # only called on a miss.
+    with _lock:
+        ctx = _contexts.get(key)
+        if ctx is not None:
+            _contexts.move_to_end(key)
+            return ctx
+    built = build()
+    ctx = AnalyticsContext(*built) if isinstance(built, tuple) else AnalyticsContext(built)
+    with _lock:
+        ctx = _contexts.setdefault(key, ctx)
+        _contexts.move_to_end(key)
+        while len(_contexts) > MAX_CONTEXTS:
+            _contexts.popitem(last=False)
+    return ctx
@@ -0,0 +1,120 @@
+# Confidence intervals for group means by bootstrap resampling. Resamples are
+# drawn as one (resamples x draws) index matrix per batch, so thousands of
+# them cost a few NumPy calls instead of a Python loop:
+#
+#   boot = Bootstrap(df["Views"], df["Platform"])
+#   boot.interval("TikTok")              # Interval(mean, low, high)
+#   boot.compare("TikTok", "Instagram")  # Comparison(winner, difference, significant)
+from functools import lru_cache
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+
+N_RESAMPLES = 2000
+CONFIDENCE = 0.95
+
+# Groups larger than this are bootstrapped within a random subsample of this
+# many rows (m-out-of-n), which stays in CPU cache; the spread of the resampled
+# means is rescaled by sqrt(m / n) around the mean of the whole group
+MAX_DRAWS = 1000
+
+# Index matrix entries per batch, at most
+BATCH_SIZE = 1 << 22
+
+
+class Interval(NamedTuple):
+    mean: float
+    low: float
+    high: float
+
+
+class Comparison(NamedTuple):
+    winner: object
+    difference: Interval  # mean of winner minus the other
+    significant: bool  # the difference's interval excludes 0
+
+
+@lru_cache(maxsize=4)
+def resample_counts(n_resamples: int, m: int) -> np.ndarray:
+    """(n_resamples x m) matrix: how many times each of m draws is picked in each resample.
+
+    Shared by every group of m or more rows: their subsamples come in random
+    order, so the same counts land on unrelated rows and the resamples of two
+    groups stay independent. Read-only.
+    """
+    rng = np.random.default_rng(0)
+    counts = np.empty((n_resamples, m))
+    batch = max(1, BATCH_SIZE // m)
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        picks = rng.integers(0, m, size=(stop - start, m), dtype=np.int32)
+        picks += np.arange(stop - start, dtype=np.int32)[:, None] * m
+        counts[start:stop] = np.bincount(picks.ravel(), minlength=(stop - start) * m).reshape(stop - start, m)
+    counts.flags.writeable = False
+    return counts
+
+
+def resample_means(values: np.ndarray, n_resamples: int = N_RESAMPLES, seed=0, max_draws: int = MAX_DRAWS) -> np.ndarray:
+    """Bootstrap distribution of the mean of `values`: `n_resamples` resampled means."""
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    rng = np.random.default_rng(seed)
+    if n >= max_draws:
+        # A random subsample, resampled by one matrix-vector product with the shared counts
+        sample = values[rng.choice(n, size=max_draws, replace=False)]
+        means = resample_counts(n_resamples, max_draws) @ sample / max_draws
+        if max_draws == n:
+            return means
+        return values.mean() + (means - sample.mean()) * np.sqrt(max_draws / n)
+    # Small groups: draw their own index matrix, in batches
+    means = np.empty(n_resamples)
+    batch = max(1, BATCH_SIZE // max(n, 1))
+    for start in range(0, n_resamples, batch):
+        stop = min(start + batch, n_resamples)
+        means[start:stop] = values[rng.integers(0, n, size=(stop - start, n), dtype=np.int32)].mean(axis=1)
+    return means
+
+
+def percentile_interval(mean: float, resampled: np.ndarray, confidence: float = CONFIDENCE) -> Interval:
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(resampled, [alpha, 1 - alpha])
+    return Interval(float(mean), float(low), float(high))
+
+
+class Bootstrap:
+    """Bootstrap distributions of the mean of `values` within each group of `groups`.
+
+    Each group is resampled with its own random stream (derived from `seed`
+    and the group's position), so distributions of different groups are
+    independent and a difference of two of them bootstraps the difference of
+    means. Results are deterministic for a given seed.
+    """
+
+    def __init__(self, values: pd.Series, groups: pd.Series, n_resamples: int = N_RESAMPLES,
+                 confidence: float = CONFIDENCE, seed: int = 0):
+        self.confidence = confidence
+        groups = groups.astype("category")
+        codes = groups.array.codes
+        values = values.to_numpy(dtype=np.float64)
+        self.means = {}
+        self.resamples = {}
+        for code, key in enumerate(groups.cat.categories):
+            selected = values[codes == code]
+            if len(selected) == 0:
+                continue
+            self.means[key] = float(selected.mean())
+            self.resamples[key] = resample_means(selected, n_resamples, seed=(seed, code))
+
+    def interval(self, group) -> Interval:
+        return percentile_interval(self.means[group], self.resamples[group], self.confidence)
+
+    def compare(self, a, b) -> Comparison:
+        winner, loser = (a, b) if self.means[a] > self.means[b] else (b, a)
+        difference = percentile_interval(self.means[winner] - self.means[loser],
+                                         self.resamples[winner] - self.resamples[loser], self.confidence)
+        return Comparison(winner, difference, bool(difference.low > 0))
+
+    def table(self) -> pd.DataFrame:
+        """mean, low and high per group."""
+        rows = {group: self.interval(group) for group in self.means}
+        return pd.DataFrame.from_dict(rows, orient="index", columns=list(Interval._fields))
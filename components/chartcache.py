@@ -0,0 +1,174 @@
+# Charts shared by every session: the aggregated frame behind each chart and
+# the Altair chart drawn from it, keyed by (page, chart, normalized sidebar
+# selection, chart parameters such as the metric, dataset version). Going back
+# to a selection seen before skips the rollups and building the chart; only
+# st.altair_chart's conversion to a spec runs again.
+#
+#   TRENDS_WARM_CHARTS=1 streamlit run home.py   # precompute common selections at startup
+import os
+import threading
+from collections import OrderedDict
+import pandas as pd
+import streamlit as st
+
+from components.data import CSV_PATH, get_dataset
+from components.filters import get_filter_index
+from components.ingest import load_aggregates
+from components.pagecharts import CHARTS, WARM_DIMENSIONS
+from components.profiling import stage
+
+# Memory held by cached frames, per dataset
+MAX_BYTES = int(float(os.environ.get("TRENDS_CHART_CACHE_MB", "64")) * 2**20)
+
+WARM = os.environ.get("TRENDS_WARM_CHARTS", "") not in ("", "0")
+
+
+def _nbytes(obj) -> int:
+    # Rough size of a chart's data
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, dict):
+        return sum(_nbytes(k) + _nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sum(_nbytes(v) for v in obj)
+    return 8
+
+
+class CachedChart:
+    __slots__ = ("data", "chart", "nbytes")
+
+    def __init__(self, data, chart):
+        self.data = data
+        # The chart refers to the frames in `data`, not copies: only those are counted
+        self.chart = chart
+        self.nbytes = _nbytes(data)
+
+
+class ChartCache:
+    """Size-bounded LRU of CachedCharts for one dataset, emptied when it changes."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.version = None
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._charts = OrderedDict()
+        self._lock = threading.Lock()
+
+    def invalidate(self, version):
+        # Entries of any other dataset version are dropped
+        with self._lock:
+            if version != self.version:
+                self._charts.clear()
+                self.nbytes = 0
+                self.version = version
+
+    def get(self, key):
+        with self._lock:
+            chart = self._charts.get(key)
+            if chart is None:
+                self.misses += 1
+                return None
+            self._charts.move_to_end(key)
+            self.hits += 1
+            return chart
+
+    def put(self, key, chart: CachedChart) -> CachedChart:
+        with self._lock:
+            if key[-1] != self.version:
+                return chart  # built from a dataset version that is already gone
+            old = self._charts.pop(key, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self._charts[key] = chart
+            self.nbytes += chart.nbytes
+            while self.nbytes > self.max_bytes and len(self._charts) > 1:
+                _, evicted = self._charts.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return chart
+
+    def __len__(self):
+        return len(self._charts)
+
+
+_caches = {}
+_lock = threading.Lock()
+
+
+def get_chart_cache(path: str = CSV_PATH) -> ChartCache:
+    dataset = get_dataset(path)
+    with _lock:
+        cache = _caches.get(dataset.path)
+        if cache is None:
+            cache = _caches[dataset.path] = ChartCache()
+    cache.invalidate(dataset.version)
+    return cache
+
+
+class ChartView:
+    """The charts of one page for one sidebar selection, built or fetched from the cache.
+
+    Charts are looked up by name in pagecharts.CHARTS[page]; `params` are the
+    values of the other widgets a chart depends on (metric, bin size, ...).
+    """
+
+    def __init__(self, page: str, filters: dict, path: str = CSV_PATH):
+        self.page = page
+        self.filters = filters
+        self.path = path
+        self.cache = get_chart_cache(path)
+        self.selection = get_filter_index(path).normalize(filters)
+
+    def chart(self, name: str, *params) -> CachedChart:
+        key = (self.page, name, self.selection, params, self.cache.version)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        aggregate, draw, _ = CHARTS[self.page][name]
+        aggs = load_aggregates(self.path)
+        with stage("aggregate", rows=len(aggs.cube)):
+            data = aggregate(aggs, self.filters, *params)
+        with stage("chart"):
+            chart = draw(data, *params)
+        return self.cache.put(key, CachedChart(data, chart))
+
+    def show(self, name: str, *params) -> CachedChart:
+        cached = self.chart(name, *params)
+        with stage("chart"):
+            st.altair_chart(cached.chart, use_container_width=True)
+        return cached
+
+
+def warm(path: str = CSV_PATH, pages=None) -> int:
+    """Builds every chart for "all selected" and each single value of a page's
+    first filter dimension (single-platform views), with default parameters.
+
+    Returns how many charts were built.
+    """
+    aggs = load_aggregates(path)
+    built = 0
+    for page in pages or CHARTS:
+        dim = WARM_DIMENSIONS[page]
+        values = list(aggs.cube.index.get_level_values(dim).unique())
+        for filters in [{}] + [{dim: [value]} for value in values]:
+            view = ChartView(page, filters, path)
+            for name, (_, _, defaults) in CHARTS[page].items():
+                before = view.cache.misses
+                view.chart(name, *defaults)
+                built += view.cache.misses - before
+    return built
+
+
+_warming = set()
+
+
+def warm_in_background(path: str = CSV_PATH):
+    # Every session of the home page calls this; only the first one per dataset starts the thread
+    with _lock:
+        if path in _warming:
+            return
+        _warming.add(path)
+    threading.Thread(target=warm, args=(path,), name="trends-warm-charts", daemon=True).start()
@@ -0,0 +1,75 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+from components.parallel import fences, group_quantiles
+
+# Outlier points sent to the browser per boxplot, at most
+MAX_OUTLIERS = 500
+
+# Rows per page of the raw data tables
+PAGE_SIZE = 100
+
+
+def boxplot_summary(df: pd.DataFrame, group: str, value: str, max_outliers: int = MAX_OUTLIERS, seed: int = 0):
+    """Quartiles and 1.5 IQR whiskers per group, plus a bounded sample of outliers.
+
+    Matches what Vega-Lite's mark_boxplot computes in the browser, but only
+    ships one row per group and at most `max_outliers` points.
+    """
+    if len(df) == 0:
+        # An emptied sidebar selection: nothing to draw, but the same columns
+        summary = pd.DataFrame({group: df[group].iloc[:0],
+                                **{c: pd.Series(dtype=float) for c in ["q1", "median", "q3", "whisker_low", "whisker_high"]},
+                                "count": pd.Series(dtype="int64")})
+        return summary, df[[group, value]].iloc[:0]
+    summary = group_quantiles(df, group, value, [0.25, 0.5, 0.75])
+    summary.columns = ["q1", "median", "q3"]
+    iqr = summary["q3"] - summary["q1"]
+    lower = (summary["q1"] - 1.5 * iqr).rename("lower")
+    upper = (summary["q3"] + 1.5 * iqr).rename("upper")
+
+    # Whiskers end at the most extreme values still inside the fences
+    bounds = pd.concat([lower, upper], axis=1)
+    whiskers, outliers = fences(df, group, value, bounds, max_outliers, seed)
+    summary = summary.join(whiskers)
+    return summary.reset_index(), outliers
+
+
+def boxplot_chart(summary: pd.DataFrame, outliers: pd.DataFrame, group: str, value: str, x_title: str, y_title: str):
+    """Layered boxplot drawn from boxplot_summary() output."""
+    base = alt.Chart(summary).encode(
+        x=alt.X(f"{group}:N", title=x_title),
+        color=alt.Color(f"{group}:N", legend=None),
+    )
+    whisker = base.mark_rule().encode(
+        y=alt.Y("whisker_low:Q", title=y_title),
+        y2="whisker_high:Q",
+    )
+    box = base.mark_bar(size=30).encode(
+        y="q1:Q",
+        y2="q3:Q",
+        tooltip=[group, "count", "whisker_low", "q1", "median", "q3", "whisker_high"],
+    )
+    median = base.mark_tick(color="white", size=30).encode(y="median:Q")
+    points = alt.Chart(outliers).mark_point().encode(
+        x=f"{group}:N",
+        y=f"{value}:Q",
+        color=alt.Color(f"{group}:N", legend=None),
+        tooltip=[group, value],
+    )
+    return whisker + box + median + points
+
+
+def paged_table(df: pd.DataFrame, key: str, page_size: int = PAGE_SIZE, rows=None):
+    # Only the current page of rows is serialized and sent to the browser. `rows`
+    # (positions into df, e.g. from select_index) pages through a filtered view
+    # without copying it.
+    n_rows = len(df) if rows is None else len(rows)
+    n_pages = max(1, -(-n_rows // page_size))
+    col_page, col_info = st.columns([1, 3])
+    page = col_page.number_input("Page", min_value=1, max_value=n_pages, value=1, step=1, key=key)
+    start = (int(page) - 1) * page_size
+    col_info.caption(f"Rows {min(start + 1, n_rows):,}–{min(start + page_size, n_rows):,} of {n_rows:,}")
+    st.dataframe(df.iloc[start:start + page_size] if rows is None else df.take(rows[start:start + page_size]))
+
@@ -0,0 +1,73 @@
+# Chat history of a session: the most recent messages in a fixed-size ring of
+# slotted records, with role strings interned so every record shares them.
+# The chat renders only the tail of it eagerly; older messages are paged.
+#
+#   TRENDS_CHAT_HISTORY=5000 streamlit run home.py   # messages kept per session
+import os
+import sys
+
+MAX_MESSAGES = int(os.environ.get("TRENDS_CHAT_HISTORY", "2000"))
+
+USER = sys.intern("user")
+ASSISTANT = sys.intern("assistant")
+
+
+class Message:
+    __slots__ = ("role", "content")
+
+    def __init__(self, role: str, content: str):
+        self.role = sys.intern(role)
+        self.content = content
+
+
+class ChatHistory:
+    """The last `maxlen` messages; appending to a full history drops the oldest.
+
+    Indexing and slicing count from the oldest message still kept.
+    """
+
+    __slots__ = ("maxlen", "total", "_ring", "_start", "_len")
+
+    def __init__(self, maxlen: int = MAX_MESSAGES):
+        self.maxlen = maxlen
+        self.total = 0  # messages ever appended, dropped ones included
+        self._ring = [None] * maxlen
+        self._start = 0
+        self._len = 0
+
+    def append(self, role: str, content: str):
+        end = (self._start + self._len) % self.maxlen
+        self._ring[end] = Message(role, content)
+        if self._len < self.maxlen:
+            self._len += 1
+        else:
+            self._start = (self._start + 1) % self.maxlen
+        self.total += 1
+
+    def clear(self):
+        self._ring = [None] * self.maxlen
+        self._start = self._len = 0
+        self.total = 0
+
+    @property
+    def dropped(self) -> int:
+        return self.total - self._len
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError("chat history index out of range")
+        return self._ring[(self._start + i) % self.maxlen]
+
+    def __iter__(self):
+        for i in range(self._len):
+            yield self._ring[(self._start + i) % self.maxlen]
+
+    def recent(self, n: int) -> list:
+        return self[max(0, self._len - n):]
@@ -0,0 +1,86 @@
+# Chatbot work off the script thread. A sidebar selection's context is built,
+# and its common aggregates precomputed, in the background as soon as the
+# selection changes; answers are computed there too and read back in parts
+# while they are produced, so the page and its chat history render first.
+#
+#   TRENDS_CHAT_WORKERS=4 streamlit run home.py
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from components.analytics import MAX_CONTEXTS, AnalyticsContext, get_context
+from components.engine import stream_answer
+
+WORKERS = int(os.environ.get("TRENDS_CHAT_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(WORKERS, thread_name_prefix="trends-chat")
+_prepared = OrderedDict()
+_lock = threading.Lock()
+
+
+def _prepare(key, build) -> AnalyticsContext:
+    return get_context(key, build).precompute()
+
+
+def prepare(key, build) -> Future:
+    """Future of the context of selection `key` (see get_context), with its
+    PRECOMPUTED aggregates. Submitted once per selection, or again if it failed."""
+    with _lock:
+        future = _prepared.get(key)
+        if future is None or (future.done() and future.exception() is not None):
+            future = _prepared[key] = _executor.submit(_prepare, key, build)
+        _prepared.move_to_end(key)
+        while len(_prepared) > MAX_CONTEXTS:
+            _prepared.popitem(last=False)
+    return future
+
+
+class AnswerJob:
+    """An answer computed on the background executor.
+
+    `ctx` is an AnalyticsContext or a Future of one. Parts are kept as they
+    come: chunks() can be read while the job runs, and read again from the
+    start by a later rerun if the one streaming it was interrupted.
+    """
+
+    def __init__(self, query: str, ctx):
+        self.query = query
+        self.parts = []
+        self.done = False
+        self.error = None
+        self._cond = threading.Condition()
+        _executor.submit(self._run, ctx)
+
+    def _run(self, ctx):
+        try:
+            if isinstance(ctx, Future):
+                ctx = ctx.result()
+            for part in stream_answer(self.query, ctx):
+                with self._cond:
+                    self.parts.append(part)
+                    self._cond.notify_all()
+        except Exception as exc:
+            self.error = exc
+        finally:
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+
+    def chunks(self):
+        # Every part from the first, waiting for the next one until the answer is complete
+        i = 0
+        while True:
+            with self._cond:
+                while i == len(self.parts) and not self.done:
+                    self._cond.wait()
+                parts, done = self.parts[i:], self.done
+            i += len(parts)
+            yield from parts
+            if done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+    def result(self) -> str:
+        return "".join(self.chunks())
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+from components.data import METRIC_COLUMNS
+from components.parallel import partials
+
+# Every page filters and groups by some subset of these
+DIMENSIONS = ["Platform", "Region", "Content_Type", "Engagement_Level"]
+METRICS = METRIC_COLUMNS + ["Engagement_Rate"]
+CUBE_COLUMNS = DIMENSIONS + METRIC_COLUMNS
+
+
+def engagement_rate(df: pd.DataFrame) -> pd.Series:
+    # (likes + shares + comments) / views, in percent; posts without views count as 0
+    safe_views = df["Views"].replace(0, np.nan)
+    return ((df["Likes"] + df["Shares"] + df["Comments"]) / safe_views * 100).fillna(0)
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    # One row per (Platform, Region, Content_Type, Engagement_Level) cell holding
+    # count, sum and sum of squares of every metric. Means, totals, counts and
+    # standard deviations for any filter/grouping can be rolled up from it.
+    # Large frames are split over the parallel backend and the partial cubes summed.
+    return merge_cubes(partials(_cube_cells, df, CUBE_COLUMNS))
+
+
+def merge_cubes(cubes) -> pd.DataFrame:
+    # Sum partial cubes cell by cell, keeping the integer counts integral
+    if len(cubes) == 1:
+        return cubes[0]
+    return pd.concat(cubes).groupby(level=DIMENSIONS, observed=True).sum()
+
+
+def _cube_cells(df: pd.DataFrame) -> pd.DataFrame:
+    values = df[METRIC_COLUMNS].astype("float64").assign(Engagement_Rate=engagement_rate(df))
+    squares = (values ** 2).add_suffix("_sumsq")
+    parts = pd.concat([df[DIMENSIONS], values.add_suffix("_sum"), squares], axis=1)
+    cube = parts.groupby(DIMENSIONS, observed=True).sum()
+    cube.insert(0, "count", df.groupby(DIMENSIONS, observed=True).size())
+    return cube
+
+
+def rollup(cube: pd.DataFrame, by=None, filters=None, stat: str = "mean", metrics=METRICS):
+    """Aggregate the cube over `by` after keeping only the `filters` selections.
+
+    `filters` maps a dimension to its selected values, `stat` is one of
+    "mean", "sum", "std" or "count". Groups without posts are dropped. With
+    `by=None` the overall value is returned as a Series (or an int for "count").
+    """
+    mask = np.ones(len(cube), dtype=bool)
+    for dim, selected in (filters or {}).items():
+        mask &= cube.index.get_level_values(dim).isin(list(selected))
+    cells = cube[mask]
+
+    if by is None:
+        totals = cells.sum()
+    else:
+        totals = cells.groupby(level=by, observed=True).sum()
+        totals = totals[totals["count"] > 0]
+
+    count = totals["count"]
+    if stat == "count":
+        return int(count) if by is None else count.rename("Count")
+
+    metrics = [metrics] if isinstance(metrics, str) else list(metrics)
+    sums = totals[[f"{m}_sum" for m in metrics]]
+    sums = sums.set_axis(metrics) if by is None else sums.set_axis(metrics, axis=1)
+    if stat == "sum":
+        return sums
+    means = sums.div(count, axis=0) if by is not None else sums / count
+    if stat == "mean":
+        return means
+    if stat == "std":
+        # Sample standard deviation from sum and sum of squares
+        sumsq = totals[[f"{m}_sumsq" for m in metrics]]
+        sumsq = sumsq.set_axis(metrics) if by is None else sumsq.set_axis(metrics, axis=1)
+        n = count if by is None else count.to_numpy()[:, None]
+        var = (sumsq - sums * means) / (n - 1)
+        return np.sqrt(var.clip(lower=0))
+    raise ValueError(f"Unknown stat: {stat}")
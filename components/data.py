@@ -0,0 +1,408 @@
+import hashlib
+import io
+import os
+import threading
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional: fall back to parsing the CSV every cold start
+    pa = None
+    feather = None
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Dataset the pages read: the shipped export unless TRENDS_CSV points elsewhere,
+# either another CSV or a directory or glob of exports (components/sources.py)
+CSV_PATH = os.path.abspath(os.environ.get("TRENDS_CSV", os.path.join(ROOT, "Viral_Social_Media_Trends.csv")))
+
+# Columnar sidecars converted from the CSV live here
+CACHE_DIR = os.path.join(ROOT, ".cache")
+
+CATEGORY_COLUMNS = ["Platform", "Hashtag", "Content_Type", "Region", "Engagement_Level"]
+METRIC_COLUMNS = ["Views", "Likes", "Shares", "Comments"]
+
+# Compact dtypes: categoricals for the dimensions, fixed-width ints for the metrics
+DTYPES = {
+    "Post_ID": "string",
+    "Platform": "category",
+    "Hashtag": "category",
+    "Content_Type": "category",
+    "Region": "category",
+    "Views": "int64",
+    "Likes": "int32",
+    "Shares": "int32",
+    "Comments": "int32",
+    "Engagement_Level": "category",
+}
+
+# Columns that are always loaded: Post_Num orders the rows and detects replayed appends
+KEY_COLUMNS = ["Post_Num"]
+
+
+def _signature(path: str):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def line_end(path: str, size: int = None) -> int:
+    # Largest offset <= size that ends a complete line: a row still being
+    # written at the end of the file is left for the next refresh
+    if size is None:
+        size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        pos = size
+        while pos > 0:
+            start = max(0, pos - (1 << 16))
+            f.seek(start)
+            block = f.read(pos - start)
+            nl = block.rfind(b"\n")
+            if nl >= 0:
+                return start + nl + 1
+            pos = start
+    return 0
+
+
+def read_bytes(path: str, start: int, stop: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(stop - start)
+
+
+def complete_row(raw: bytes, header: bytes) -> bool:
+    # Whether `raw`, the bytes after the last newline, is one whole row: every
+    # field of the header, none empty. A static export may not end with a newline
+    if not raw.strip():
+        return False
+    try:
+        row = pd.read_csv(io.BytesIO(header + raw), dtype=str, index_col=False)
+    except (ValueError, pd.errors.ParserError):
+        return False
+    return len(row) == 1 and not row.isna().to_numpy().any()
+
+
+def content_hash(path: str, nbytes: int = None) -> str:
+    h = hashlib.blake2b(digest_size=8)
+    remaining = os.path.getsize(path) if nbytes is None else nbytes
+    with open(path, "rb") as f:
+        while remaining > 0:
+            block = f.read(min(1 << 20, remaining))
+            if not block:
+                break
+            h.update(block)
+            remaining -= len(block)
+    return h.hexdigest()
+
+
+def _usecols(columns):
+    if columns is None:
+        return None
+    # Post_Num is derived from Post_ID
+    return [c for c in DTYPES if c in columns or (c == "Post_ID" and "Post_Num" in columns)]
+
+
+def post_numbers(ids: pd.Series) -> np.ndarray:
+    # Sequence number of each post ("Post_123" -> 123). IDs share the "Post_"
+    # prefix, so a vectorized slice + int cast does it without a regex per row.
+    if len(ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+    if ids.str.startswith("Post_").all():
+        return ids.str.slice(5).astype("int64").to_numpy()
+    return ids.str.extract(r"(\d+)", expand=False).astype("int64").to_numpy()
+
+
+def _finish(df: pd.DataFrame, columns=None) -> pd.DataFrame:
+    if "Post_ID" in df.columns:
+        # Parsed once at load; everything downstream uses Post_Num
+        df["Post_Num"] = post_numbers(df["Post_ID"])
+    if columns is not None:
+        df = df[list(columns)]
+    return df
+
+
+def parse_csv(path: str, columns=None) -> pd.DataFrame:
+    return _finish(pd.read_csv(path, dtype=DTYPES, usecols=_usecols(columns)), columns)
+
+
+def parse_bytes(raw: bytes, header: bytes = b"", columns=None) -> pd.DataFrame:
+    # `header` is prepended when `raw` is a slice from the middle of the file
+    return _finish(pd.read_csv(io.BytesIO(header + raw), dtype=DTYPES, usecols=_usecols(columns)), columns)
+
+
+def sidecar_path(path: str, nbytes: int = None) -> str:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{content_hash(path, nbytes)}.feather")
+
+
+def convert(path: str, nbytes: int = None, target: str = None) -> str:
+    # Write an uncompressed Feather (Arrow IPC) file of the first `nbytes` of the
+    # CSV (all of it by default) so later loads can memory-map it. `target` is
+    # sidecar_path(path, nbytes) when the caller already knows it: hashing
+    # rereads the CSV
+    target = target or sidecar_path(path, nbytes)
+    if os.path.exists(target):
+        return target
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    df = parse_csv(path) if nbytes is None else parse_bytes(read_bytes(path, 0, nbytes))
+    tmp = f"{target}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, target)
+
+    # Drop sidecars of older versions of the same CSV
+    prefix = os.path.basename(target).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(CACHE_DIR):
+        old = os.path.join(CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(".feather") and old != target:
+            os.remove(old)
+    return target
+
+
+def read_columnar(path: str, columns=None) -> pd.DataFrame:
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def new_rows(post_nums: np.ndarray, last: int) -> np.ndarray:
+    # The export is append-only with increasing Post_IDs: a row whose number is not
+    # above every earlier one was already ingested (e.g. a replayed append)
+    if len(post_nums) == 0:
+        return np.zeros(0, dtype=bool)
+    prev = np.maximum.accumulate(np.concatenate([[last], post_nums[:-1]]))
+    return post_nums > prev
+
+
+class _Buffer:
+    """Append-only array with amortized O(1) growth; views stay valid after appends."""
+
+    def __init__(self, dtype, capacity: int = 1024):
+        self.data = np.empty(capacity, dtype=dtype)
+        self.n = 0
+
+    def append(self, values: np.ndarray):
+        need = self.n + len(values)
+        dtype = np.promote_types(self.data.dtype, values.dtype)
+        if need > len(self.data) or dtype != self.data.dtype:
+            grown = np.empty(max(need, 2 * len(self.data)), dtype=dtype)
+            grown[:self.n] = self.data[:self.n]
+            self.data = grown
+        self.data[self.n:need] = values
+        self.n = need
+
+    def view(self, start: int = 0, stop: int = None) -> np.ndarray:
+        return self.data[start:self.n if stop is None else stop]
+
+
+class _CategoryColumn:
+    """Categorical column whose categories only grow, so existing codes never change."""
+
+    def __init__(self):
+        self.codes = _Buffer(np.int8)
+        self.categories = []
+        self._lookup = {}
+
+    def append(self, values: pd.Series):
+        values = values.astype("category")
+        remap = np.empty(len(values.cat.categories) + 1, dtype=np.int64)
+        remap[-1] = -1  # missing values keep code -1
+        for i, cat in enumerate(values.cat.categories):
+            code = self._lookup.get(cat)
+            if code is None:
+                code = self._lookup[cat] = len(self.categories)
+                self.categories.append(cat)
+            remap[i] = code
+        codes = remap[values.cat.codes.to_numpy()]
+        dtype = np.int8 if len(self.categories) < 2**7 else np.int16 if len(self.categories) < 2**15 else np.int32
+        self.codes.append(codes.astype(dtype))
+
+    def view(self, start: int = 0, stop: int = None) -> pd.Series:
+        dtype = pd.CategoricalDtype(self.categories)
+        values = pd.Categorical.from_codes(self.codes.view(start, stop), dtype=dtype, validate=False)
+        return pd.Series(values, copy=False)
+
+
+def _column_for(col: str):
+    if DTYPES.get(col) == "category":
+        return _CategoryColumn()
+    return _Buffer(object if col == "Post_ID" else np.dtype(DTYPES.get(col, "int64")))
+
+
+class Dataset:
+    """The dashboard's in-memory copy of one append-only CSV export.
+
+    The first load reads the columnar sidecar (or the CSV). After that,
+    refresh() parses only the bytes appended since the last refresh, drops
+    rows already seen (by Post_ID number) and appends them to growable
+    column buffers, so its cost scales with the delta. Columns are loaded on
+    first use. A rewritten or truncated file triggers a full reload, which
+    bumps `generation`.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.generation = 0
+        self._lock = threading.RLock()
+        self._sig = None
+        self._load_full()
+
+    def _load_full(self):
+        self.generation += 1
+        with open(self.path, "rb") as f:
+            self._header = f.readline()
+        self.base_offset = line_end(self.path)
+        size = os.path.getsize(self.path)
+        if size > self.base_offset and complete_row(read_bytes(self.path, self.base_offset, size), self._header):
+            self.base_offset = size
+        self.offset = self.base_offset
+        # Named after a hash of the base rows: computed once, not on every lazy column load
+        self._sidecar = sidecar_path(self.path, self.base_offset) if feather is not None else None
+        self._frames = {}
+        self._columns = {}
+        self._base_last = 0
+        base = self._read_base(KEY_COLUMNS)
+        self._append(base)
+        self.n_rows = len(base)
+        self._base_rows = self.n_rows
+        self.last_post_num = self._base_last = int(base["Post_Num"].max()) if len(base) else 0
+        self._anchor = self._read_anchor()
+
+    def _read_base(self, columns) -> pd.DataFrame:
+        # Rows in [0, base_offset), i.e. the file as it was at the last full load
+        if self._sidecar is not None:
+            try:
+                return read_columnar(convert(self.path, self.base_offset, self._sidecar), columns)
+            except (OSError, pa.ArrowException):
+                # Unwritable cache dir or a corrupt sidecar: the CSV is still the source of truth
+                pass
+        return parse_bytes(read_bytes(self.path, 0, self.base_offset), columns=columns)
+
+    def _read_anchor(self) -> bytes:
+        # The bytes just before `offset`: if they change, the file was rewritten
+        return read_bytes(self.path, max(0, self.offset - 256), self.offset)
+
+    def _row_continued(self, size: int) -> bool:
+        # The unterminated last row of the full load was still being written after all
+        if size <= self.offset or not self._anchor or self._anchor.endswith(b"\n"):
+            return False
+        return read_bytes(self.path, self.offset, self.offset + 1) not in (b"\n", b"\r")
+
+    def _parse_tail(self, start: int, stop: int, last: int, columns=None) -> pd.DataFrame:
+        if stop <= start:
+            return parse_bytes(b"", self._header, columns)
+        if columns is not None:
+            columns = list(dict.fromkeys(list(columns) + ["Post_Num"]))
+        df = parse_bytes(read_bytes(self.path, start, stop), self._header, columns)
+        return df[new_rows(df["Post_Num"].to_numpy(), last)]
+
+    def _append(self, df: pd.DataFrame):
+        for col in df.columns:
+            column = self._columns.get(col)
+            if column is None:
+                column = self._columns[col] = _column_for(col)
+            if isinstance(column, _CategoryColumn):
+                column.append(df[col])
+            else:
+                column.append(df[col].to_numpy(dtype=column.data.dtype))
+
+    def _ensure(self, columns):
+        missing = [c for c in columns if c not in self._columns]
+        if not missing:
+            return
+        try:
+            base = self._read_base(missing)
+        except OSError:
+            # The sidecar this generation was loaded from is gone: start over
+            self._load_full()
+            return self._ensure(columns)
+        tail = self._parse_tail(self.base_offset, self.offset, self._base_last, missing)
+        self._append(base[missing])
+        self._append(tail[missing])
+
+    def refresh(self) -> bool:
+        """Pick up rows appended since the last call; True if the data changed."""
+        with self._lock:
+            sig = _signature(self.path)
+            if sig == self._sig:
+                return False
+            old = self.version
+            self._sig = sig
+            if sig[1] < self.offset or self._read_anchor() != self._anchor or self._row_continued(sig[1]):
+                self._load_full()
+            else:
+                stop = line_end(self.path, sig[1])
+                tail = self._parse_tail(self.offset, stop, self.last_post_num, list(self._columns))
+                self._append(tail)
+                self.offset = stop
+                self.n_rows += len(tail)
+                if len(tail):
+                    self.last_post_num = int(tail["Post_Num"].max())
+                self._anchor = self._read_anchor()
+            if self.version != old:
+                self._frames = {}
+            return self.version != old
+
+    @property
+    def version(self):
+        return (self.generation, self.n_rows)
+
+    def frame(self, columns=None, start: int = 0, stop: int = None) -> pd.DataFrame:
+        """Rows [start, stop) as a dataframe sharing memory with the buffers (read-only)."""
+        with self._lock:
+            if columns is None:
+                columns = list(DTYPES) + ["Post_Num"]
+            columns = list(columns)
+            self._ensure(columns)
+            stop = self.n_rows if stop is None else stop
+            key = (tuple(columns), start, stop)
+            df = self._frames.get(key)
+            if df is None:
+                data = {}
+                for col in columns:
+                    column = self._columns[col]
+                    if isinstance(column, _CategoryColumn):
+                        data[col] = column.view(start, stop)
+                    else:
+                        values = column.view(start, stop)
+                        data[col] = pd.Series(values, dtype=values.dtype, copy=False)
+                df = pd.DataFrame(data, copy=False)
+                if start == 0 and stop == self.n_rows:
+                    self._frames[key] = df
+            return df
+
+
+def is_source_set(path: str) -> bool:
+    # A directory or glob of exports rather than a single CSV
+    return os.path.isdir(path) or any(c in path for c in "*?[")
+
+
+# Process-wide datasets, one per CSV path (or directory / glob)
+_datasets = {}
+_lock = threading.Lock()
+
+
+def get_dataset(path: str = CSV_PATH) -> Dataset:
+    path = os.path.abspath(path)
+    with _lock:
+        ds = _datasets.get(path)
+        if ds is None:
+            if is_source_set(path):
+                from components.sources import SourceSet  # subclasses Dataset
+
+                ds = _datasets[path] = SourceSet(path)
+            else:
+                ds = _datasets[path] = Dataset(path)
+    ds.refresh()
+    return ds
+
+
+def load_data(path: str = CSV_PATH, columns=None) -> pd.DataFrame:
+    # The returned frame is shared by every session and page: treat it as read-only.
+    # Pass `columns` to load only what a page needs; appended rows are picked up
+    # incrementally on the next call.
+    return get_dataset(path).frame(columns)
+
+
+def dataset_version(path: str = CSV_PATH):
+    # Changes whenever rows are appended or the file is rewritten
+    return get_dataset(path).version
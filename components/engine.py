@@ -0,0 +1,252 @@
+# Question answering behind the chatbot, usable without Streamlit:
+#
+#   python -m components.engine --input questions.txt --output answers.jsonl --workers 8
+import argparse
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from components.analytics import AnalyticsContext
+from components.bootstrap import CONFIDENCE
+from components.data import CSV_PATH, get_dataset
+from components.filters import select_index
+from components.ingest import load_aggregates
+from components.intents import query_key
+from components.parallel import process_context
+from components.profiling import timed
+from components.shared import attach, get_shared
+
+# Columns the engine needs from the dataset
+ENGINE_COLUMNS = ["Platform", "Hashtag", "Content_Type", "Region", "Views", "Likes", "Shares", "Comments"]
+
+
+@timed("respond")
+def generate_response(query: str, ctx: AnalyticsContext) -> str:
+    return "".join(stream_response(query, ctx))
+
+
+def stream_answer(query: str, ctx: AnalyticsContext):
+    """stream_response, remembered by the context: a question it has answered
+    before (same words, any case or punctuation) comes back at once, whole."""
+    key = query_key(query)
+    answer = ctx.answer(key)
+    if answer is not None:
+        yield answer
+        return
+    parts = []
+    for part in stream_response(query, ctx):
+        parts.append(part)
+        yield part
+    ctx.remember(key, "".join(parts))
+
+
+def stream_response(query: str, ctx: AnalyticsContext):
+    """The answer to `query` in parts, each yielded as soon as it is known:
+    answers with one line per metric or entity come line by line."""
+    # Aggregates are computed lazily by the context and shared across messages;
+    # the query itself is parsed in a single pass
+    intent = ctx.parser.parse(query)
+    requested_metrics = intent.metrics
+    entities = intent.entities
+
+    # Greeting or help
+    if intent.greeting:
+        yield "Hello! I can provide top platforms, content types, regions, hashtags, timing tips, or strategy advice. What would you like?"
+        return
+    if intent.help:
+        yield ("Ask me things like:\n"
+               "- Best platform for views/likes/engagement?\n"
+               "- Top content type by shares?\n"
+               "- Compare TikTok vs Instagram.\n"
+               "- Top hashtags.\n"
+               "- Best time to post.\n"
+               "- Provide strategy tips.")
+        return
+
+    # An empty sidebar selection leaves nothing to rank
+    if ctx.n_rows == 0:
+        yield "No posts in the current selection: pick at least one platform, region and content type."
+        return
+
+    # Hashtag query: platforms, regions and content types named in the question
+    # narrow the selection; a metric ranks by its average instead of usage
+    if "hashtag" in entities:
+        scope = {dim: values for dim, values in (("Platform", intent.platforms),
+                                                 ("Region", intent.regions),
+                                                 ("Content_Type", intent.content_types)) if values}
+        by = requested_metrics[0] if requested_metrics else "count"
+        top5 = ctx.hashtags(5, by, scope)
+        where = " for " + " ".join(v for values in scope.values() for v in values) if scope else ""
+        ranking = f" by average {by.lower()}" if by != "count" else ""
+        if top5.empty:
+            yield f"No posts{where} in the current selection."
+            return
+        yield f"Top hashtags{where}{ranking}: " + ", ".join([f"#{tag}" for tag in top5.index.tolist()]) + "."
+        return
+
+    # Compare two platforms
+    if "compare" in entities:
+        mentioned = [p for p in intent.platforms if p in ctx.avg_platform.index]
+        if len(mentioned) >= 2:
+            p1, p2 = mentioned[:2]
+            yield f"Comparison results ({CONFIDENCE:.0%} confidence intervals):"
+            for m in requested_metrics or ["Views"]:
+                val1, val2 = ctx.avg_platform.at[p1, m], ctx.avg_platform.at[p2, m]
+                champ = p1 if val1 > val2 else p2
+                # Bootstrap intervals tell a real difference from noise in heavy-tailed metrics
+                boot = ctx.bootstrap("Platform", m)
+                ci1, ci2 = boot.interval(p1), boot.interval(p2)
+                verdict = "significant" if boot.compare(p1, p2).significant else "not significant"
+                yield (f"\n{m}: {p1} {val1:.0f} ({ci1.low:.0f}–{ci1.high:.0f}) vs "
+                       f"{p2} {val2:.0f} ({ci2.low:.0f}–{ci2.high:.0f}) → Top: {champ} ({verdict})")
+            return
+        yield "Please specify two platforms to compare, e.g. 'Compare TikTok vs Instagram'."
+        return
+
+    # Best/worst entities
+    if requested_metrics and entities:
+        metric = requested_metrics[0]
+        sep = ""
+        for ent in [e for e in entities if e in ("platform","content","region")]:
+            df_map = ctx.averages(ent)
+            if intent.superlative == "best":
+                idx = df_map[metric].idxmax()
+                val = df_map[metric].max()
+                yield f"{sep}Top {ent}: {idx} ({val:.2f}) by {metric.lower()}"
+            elif intent.superlative == "worst":
+                idx = df_map[metric].idxmin()
+                val = df_map[metric].min()
+                yield f"{sep}Lowest {ent}: {idx} ({val:.2f}) by {metric.lower()}"
+            else:
+                continue
+            sep = "\n"
+        if sep:
+            return
+
+    # Default comparisons: top 3 if just entity
+    if not requested_metrics and entities:
+        ent = entities[0]
+        if ent in ("platform","content","region"):
+            df_map = ctx.averages(ent)
+            top3 = df_map["Views"].nlargest(3)
+            lines = [f"{i+1}. {idx} ({val:.0f} avg views)" for i,(idx,val) in enumerate(top3.items())]
+            yield f"Top 3 {ent}s by views:\n" + "\n".join(lines)
+            return
+
+    # Timing
+    if "time" in entities:
+        yield "🕒 Best posting window: 4–7 PM local time, especially for video content on TikTok & Instagram."
+        return
+
+    # Strategy advice
+    if "strategy" in entities:
+        bp = ctx.avg_platform["Views"].idxmax()
+        bc = ctx.avg_content["Views"].idxmax()
+        tags = ctx.top_hashtags.head(3).index.tolist()
+        yield (
+            f"Strategy Tips:\n"
+            f"1. Focus on {bc} content.\n"
+            f"2. Prioritize {bp} platform.\n"
+            f"3. Use hashtags: {', '.join(tags)}.\n"
+            "4. Post around 4–7 PM.\n"
+            "5. Encourage comments with CTAs."
+        )
+        return
+
+    # Overall stats
+    if "stats" in entities:
+        avgs = ctx.overall
+        lines = [f"{c}: {avgs[c]:,.0f}" for c in ["Views","Likes","Shares","Comments"]]
+        yield "Overall averages:\n" + "\n".join(lines)
+        return
+
+    # Fallback
+    yield ("Sorry, I didn't get that. You can ask about top platforms/content/regions, "
+           "compare platforms, top hashtags, best times to post, or strategy tips.")
+
+
+class ChatEngine:
+    """Answers chatbot questions against one (optionally filtered) dataset.
+
+    All answers share one AnalyticsContext, so a batch pays for each aggregate once.
+    """
+
+    def __init__(self, path: str = CSV_PATH, filters=None, df=None):
+        self.path = path
+        self.filters = filters or {}
+        if df is None:
+            self.ctx = AnalyticsContext(get_dataset(path).frame(ENGINE_COLUMNS), select_index(self.filters, path),
+                                        load_aggregates(path).hashtags, self.filters)
+        else:
+            self.ctx = AnalyticsContext(df, _filter_rows(df, self.filters), filters=self.filters)
+
+    def answer(self, query: str) -> str:
+        return generate_response(query, self.ctx)
+
+    def answer_many(self, queries, workers: int = 1, chunk_size: int = 1000) -> list:
+        queries = list(queries)
+        if workers <= 1 or len(queries) <= chunk_size:
+            return [self.answer(q) for q in queries]
+        # Workers map the dataset from shared memory instead of loading it, build
+        # their own aggregates once, then answer whole chunks
+        spec = get_shared(self.path, ENGINE_COLUMNS).spec
+        chunks = [queries[i:i + chunk_size] for i in range(0, len(queries), chunk_size)]
+        with ProcessPoolExecutor(workers, mp_context=process_context(), initializer=_init_worker,
+                                 initargs=(spec, self.filters)) as pool:
+            return [a for answers in pool.map(_answer_chunk, chunks) for a in answers]
+
+
+def _filter_rows(df, filters):
+    # Positions of the rows of `df` matching every selection, or None for all rows
+    if not filters:
+        return None
+    mask = np.ones(len(df), dtype=bool)
+    for col, selected in filters.items():
+        mask &= df[col].isin(list(selected)).to_numpy()
+    return np.flatnonzero(mask)
+
+
+_worker_engine = None
+
+
+def _init_worker(spec: dict, filters):
+    global _worker_engine
+    _worker_engine = ChatEngine(filters=filters, df=attach(spec))
+
+
+def _answer_chunk(queries: list) -> list:
+    return [_worker_engine.answer(q) for q in queries]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Answer chatbot questions in batch, one JSON line per answer.")
+    parser.add_argument("--input", "-i", help="file with one question per line (default: stdin)")
+    parser.add_argument("--output", "-o", help="JSONL file to write (default: stdout)")
+    parser.add_argument("--data", default=CSV_PATH, help="dataset CSV, or a directory or glob of CSV exports")
+    parser.add_argument("--platform", nargs="+", help="only use these platforms")
+    parser.add_argument("--region", nargs="+", help="only use these regions")
+    parser.add_argument("--content-type", nargs="+", help="only use these content types")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for large batches")
+    args = parser.parse_args(argv)
+
+    filters = {col: values for col, values in (("Platform", args.platform),
+                                               ("Region", args.region),
+                                               ("Content_Type", args.content_type)) if values}
+    source = open(args.input, encoding="utf-8") if args.input else sys.stdin
+    with source:
+        queries = [line.strip() for line in source if line.strip()]
+
+    answers = ChatEngine(args.data, filters).answer_many(queries, workers=args.workers)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for query, answer in zip(queries, answers):
+            out.write(json.dumps({"query": query, "answer": answer}, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
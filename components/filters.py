@@ -0,0 +1,143 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+
+from components.data import CSV_PATH, Dataset, get_dataset
+
+# Dimensions the sidebars filter on
+FILTER_DIMENSIONS = ["Platform", "Region", "Content_Type"]
+
+# Filtered row selections kept alive at once, per dataset
+MAX_VIEWS = 64
+
+
+class FilterIndex:
+    """Per-value row bitmaps for each filter dimension of a Dataset.
+
+    A selection becomes an OR of the selected values' bitmaps within a
+    dimension and an AND across dimensions, on packed bits (one byte per 8
+    rows) instead of a full isin() scan per column. A filtered view is the
+    array of matching row positions, cached per selection and shared by every
+    session: it costs 4 bytes per matching row instead of a copy of the
+    columns. Appended rows extend the bitmaps; a full reload of the dataset
+    rebuilds them.
+    """
+
+    def __init__(self, dataset: Dataset, dims=FILTER_DIMENSIONS):
+        self.dataset = dataset
+        self.dims = list(dims)
+        self.version = None
+        self.n_rows = 0
+        self.categories = {}
+        self.bitmaps = {}
+        self._views = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self):
+        with self._lock:
+            version = self.dataset.version
+            if version == self.version:
+                return self
+            if self.version is None or self.version[0] != version[0]:
+                self.n_rows = 0
+                self.bitmaps = {dim: {} for dim in self.dims}
+            # Re-pack from the last partial byte so new rows line up with the old bits
+            start = self.n_rows - self.n_rows % 8
+            frame = self.dataset.frame(self.dims, start=start, stop=version[1])
+            for dim in self.dims:
+                codes = frame[dim].array.codes
+                self.categories[dim] = list(frame[dim].cat.categories)
+                bitmaps = self.bitmaps[dim]
+                for code, value in enumerate(self.categories[dim]):
+                    packed = np.packbits(codes == code)
+                    old = bitmaps.get(value)
+                    if old is None:
+                        old = np.zeros(start // 8, dtype=np.uint8)
+                    bitmaps[value] = np.concatenate([old[:start // 8], packed])
+            self.n_rows = version[1]
+            self.version = version
+            self._views.clear()
+            return self
+
+    def normalize(self, selection: dict) -> tuple:
+        # Hashable form of a selection; dimensions with every value selected are dropped
+        key = []
+        for dim in self.dims:
+            if dim not in selection:
+                continue
+            chosen = frozenset(map(str, selection[dim]))
+            if chosen >= set(self.categories[dim]):
+                continue
+            key.append((dim, chosen))
+        return tuple(key)
+
+    def mask(self, selection: dict):
+        """Boolean row mask for `selection`, or None when it keeps every row."""
+        key = self.normalize(selection)
+        if not key:
+            return None
+        combined = None
+        for dim, chosen in key:
+            bitmaps = self.bitmaps[dim]
+            selected = [bitmaps[v] for v in chosen if v in bitmaps]
+            if selected:
+                bits = np.bitwise_or.reduce(selected) if len(selected) > 1 else selected[0]
+            else:
+                bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            combined = bits if combined is None else combined & bits
+        return np.unpackbits(combined, count=self.n_rows).view(bool)
+
+    def rows(self, selection: dict):
+        """Positions of the rows matching `selection`, or None when it keeps every row."""
+        with self._lock:
+            key = self.normalize(selection)
+            if not key:
+                return None
+            rows = self._views.get(key)
+            if rows is not None:
+                self._views.move_to_end(key)
+                return rows
+            version = self.version
+            mask = self.mask(selection)
+        rows = np.flatnonzero(mask).astype(np.int32 if len(mask) < 2**31 else np.int64)
+        rows.flags.writeable = False
+        with self._lock:
+            if self.version == version:
+                self._views[key] = rows
+                while len(self._views) > MAX_VIEWS:
+                    self._views.popitem(last=False)
+        return rows
+
+    def select(self, selection: dict, columns=None) -> pd.DataFrame:
+        """Rows of the dataset matching `selection` (dimension -> selected values)."""
+        # Positions first: a concurrent append only adds rows past them
+        rows = self.rows(selection)
+        with self._lock:
+            frame = self.dataset.frame(columns, stop=self.n_rows)
+        return frame if rows is None else frame.take(rows)
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def get_filter_index(path: str = CSV_PATH) -> FilterIndex:
+    dataset = get_dataset(path)  # also picks up appended rows
+    with _lock:
+        index = _indexes.get(dataset.path)
+        if index is None:
+            index = _indexes[dataset.path] = FilterIndex(dataset)
+    return index.update()
+
+
+def select_index(selection: dict, path: str = CSV_PATH):
+    # Row positions into load_data() for `selection` (None: every row). The array is
+    # shared with other sessions and read-only.
+    return get_filter_index(path).rows(selection)
+
+
+def select_rows(selection: dict, columns=None, path: str = CSV_PATH) -> pd.DataFrame:
+    # A fresh frame for `selection`; prefer select_index() where positions suffice.
+    # With every row selected this is the shared, read-only dataset frame.
+    return get_filter_index(path).select(selection, columns)
@@ -0,0 +1,127 @@
+import threading
+from functools import partial
+import numpy as np
+import pandas as pd
+
+from components.cube import METRICS, engagement_rate
+from components.data import METRIC_COLUMNS
+from components.parallel import partials
+
+# Segments hashtag rankings can be narrowed to
+SEGMENTS = ["Platform", "Region", "Content_Type"]
+CELLS = SEGMENTS + ["Hashtag"]
+HASHTAG_COLUMNS = CELLS + METRIC_COLUMNS
+
+
+def narrow(*selections) -> dict:
+    # Intersection of several dimension -> selected values mappings
+    merged = {}
+    for selection in selections:
+        for dim, values in (selection or {}).items():
+            values = set(map(str, values))
+            merged[dim] = merged[dim] & values if dim in merged else values
+    return merged
+
+
+def _cell_sums(df: pd.DataFrame, shape: tuple, metrics) -> tuple:
+    # Post count and metric sums of these rows per cell, as dense arrays of `shape`
+    codes = [df[dim].array.codes.astype(np.int64) for dim in CELLS]
+    keep = np.logical_and.reduce([c >= 0 for c in codes])
+    cell = np.ravel_multi_index(tuple(c[keep] for c in codes), shape)
+    size = int(np.prod(shape))
+    count = np.bincount(cell, minlength=size).reshape(shape)
+    values = df[METRIC_COLUMNS].assign(Engagement_Rate=engagement_rate(df))
+    sums = {m: np.bincount(cell, weights=values[m].to_numpy(dtype=np.float64)[keep], minlength=size).reshape(shape)
+            for m in metrics}
+    return count, sums
+
+
+class HashtagIndex:
+    """Post counts and metric sums per (Platform, Region, Content_Type, Hashtag).
+
+    Dense arrays grown as categories appear; folding in rows costs O(rows).
+    A ranking sums the selected segments (at most platforms x regions x
+    content types cells per hashtag), then keeps the best k with a partial
+    sort: O(cells + n log k) for n hashtags, independent of the number of posts.
+    """
+
+    def __init__(self, metrics=METRICS):
+        self.metrics = list(metrics)
+        self.categories = {dim: [] for dim in CELLS}
+        self.count = np.zeros((0, 0, 0, 0), dtype=np.int64)
+        self.sums = {m: np.zeros((0, 0, 0, 0), dtype=np.float64) for m in self.metrics}
+        self._lock = threading.Lock()
+
+    def _grow(self, shape):
+        old = self.count.shape
+        if all(n <= o for n, o in zip(shape, old)):
+            return
+        shape = tuple(max(n, o) for n, o in zip(shape, old))
+
+        def grow(a):
+            grown = np.zeros(shape, dtype=a.dtype)
+            grown[tuple(slice(0, n) for n in old)] = a
+            return grown
+
+        self.count = grow(self.count)
+        self.sums = {m: grow(a) for m, a in self.sums.items()}
+
+    def add(self, df: pd.DataFrame):
+        if len(df) == 0:
+            return self
+        with self._lock:
+            # Dataset frames share append-only categories, so codes are stable across deltas
+            df = df.astype({dim: "category" for dim in CELLS})
+            for dim in CELLS:
+                self.categories[dim] = list(df[dim].cat.categories)
+            self._grow(tuple(len(self.categories[dim]) for dim in CELLS))
+            kernel = partial(_cell_sums, shape=self.count.shape, metrics=self.metrics)
+            for count, sums in partials(kernel, df, HASHTAG_COLUMNS):
+                self.count += count
+                for m in self.metrics:
+                    self.sums[m] += sums[m]
+        return self
+
+    def totals(self, filters=None) -> pd.DataFrame:
+        """Count and metric sums per hashtag over the segments selected by `filters`."""
+        with self._lock:
+            axes = []
+            for dim in SEGMENTS:
+                categories = self.categories[dim]
+                if filters and dim in filters:
+                    selected = set(map(str, filters[dim]))
+                    axes.append([i for i, v in enumerate(categories) if str(v) in selected])
+                else:
+                    axes.append(list(range(len(categories))))
+            cells = np.ix_(*axes, np.arange(len(self.categories["Hashtag"])))
+            data = {"count": self.count[cells].sum(axis=(0, 1, 2))}
+            for m in self.metrics:
+                data[f"{m}_sum"] = self.sums[m][cells].sum(axis=(0, 1, 2))
+            index = pd.Index(self.categories["Hashtag"], name="Hashtag")
+        return pd.DataFrame(data, index=index)
+
+    def top(self, k: int = 5, by: str = "count", filters=None, stat: str = "mean") -> pd.Series:
+        """The k best hashtags within `filters`, by post count or a metric's mean (or sum).
+
+        Hashtags without posts in the selection are left out; ties keep the
+        category order, like value_counts(). k=None ranks every hashtag.
+        """
+        totals = self.totals(filters)
+        totals = totals[totals["count"] > 0]
+        if by == "count":
+            values = totals["count"].to_numpy()
+        elif stat == "sum":
+            values = totals[f"{by}_sum"].to_numpy()
+        else:
+            values = totals[f"{by}_sum"].to_numpy() / totals["count"].to_numpy()
+        n = len(values)
+        k = n if k is None else min(k, n)
+        if k < n:
+            best = np.argpartition(-values, k - 1)[:k]
+            # Everything tied with the k-th value competes on category order
+            best = np.flatnonzero(values >= values[best].min())
+        else:
+            best = np.arange(n)
+        order = best[np.lexsort((best, -values[best]))][:k]
+        name = "Count" if by == "count" else by
+        return pd.Series(values[order], index=totals.index[order], name=name)
@@ -0,0 +1,55 @@
+import threading
+
+from components.cube import CUBE_COLUMNS, build_cube, merge_cubes
+from components.data import CSV_PATH, Dataset, get_dataset
+from components.hashtags import HashtagIndex
+from components.trends import TrendBins
+
+AGGREGATE_COLUMNS = list(dict.fromkeys(CUBE_COLUMNS + ["Hashtag", "Post_Num"]))
+
+
+class RunningAggregates:
+    """Cube, hashtag index and trend bins, kept up to date with appends.
+
+    update() folds only the rows added to the dataset since the previous call;
+    a full reload of the dataset (new generation) recomputes from scratch.
+    """
+
+    def __init__(self, dataset: Dataset):
+        self.dataset = dataset
+        self.version = None
+        self.cube = None
+        self.hashtags = None
+        self.bins = None
+        self._lock = threading.Lock()
+
+    def update(self):
+        with self._lock:
+            version = self.dataset.version
+            if version == self.version:
+                return self
+            if self.version is None or self.version[0] != version[0]:
+                df = self.dataset.frame(AGGREGATE_COLUMNS, stop=version[1])
+                self.cube = build_cube(df)
+                self.hashtags = HashtagIndex()
+                self.bins = TrendBins()
+            else:
+                df = self.dataset.frame(AGGREGATE_COLUMNS, start=self.version[1], stop=version[1])
+                self.cube = merge_cubes([self.cube, build_cube(df)])
+            self.hashtags.add(df)
+            self.bins.add(df)
+            self.version = version
+            return self
+
+
+_aggregates = {}
+_lock = threading.Lock()
+
+
+def load_aggregates(path: str = CSV_PATH) -> RunningAggregates:
+    dataset = get_dataset(path)  # also picks up appended rows
+    with _lock:
+        aggs = _aggregates.get(dataset.path)
+        if aggs is None:
+            aggs = _aggregates[dataset.path] = RunningAggregates(dataset)
+    return aggs.update()
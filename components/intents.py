@@ -0,0 +1,148 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+# Fixed vocabulary: phrase -> (kind, value). Dataset values are added per parser.
+METRIC_TERMS = {
+    "views": "Views", "view": "Views",
+    "likes": "Likes", "like": "Likes",
+    "shares": "Shares", "share": "Shares",
+    "comments": "Comments", "comment": "Comments",
+    "engagement rate": "Engagement_Rate", "engagement": "Engagement_Rate",
+}
+ENTITY_TERMS = {
+    "platform": ["platform", "platforms"],
+    "content": ["content", "contents", "format", "formats", "type", "types"],
+    "region": ["region", "regions", "country", "countries", "location", "locations"],
+    "hashtag": ["hashtag", "hashtags"],
+    "compare": ["compare", "compared", "comparing", "comparison", "vs", "versus"],
+    "time": ["time", "times", "when"],
+    "strategy": ["strategy", "strategies", "tip", "tips", "recommend", "recommendation",
+                 "recommendations", "advice", "suggest", "suggestion", "suggestions"],
+    "stats": ["average", "averages", "stat", "stats", "statistics", "overview", "metric", "metrics"],
+}
+SUPERLATIVE_TERMS = {
+    "best": ["best", "top", "highest", "most"],
+    "worst": ["worst", "least", "lowest", "underperform", "underperforming"],
+}
+GREETING_TERMS = ["hello", "hi", "hey"]
+HELP_TERMS = ["help"]
+
+# Content types that are also everyday verbs ("when should I post?"): they name
+# the content type in the plural ("posts"), or followed by one of TYPE_WORDS
+VERB_CONTENT_TYPES = {"post", "tweet"}
+TYPE_WORDS = {"type", "types", "format", "formats"}
+
+# Order in which entities are reported (and tried by the chatbot)
+ENTITY_ORDER = list(ENTITY_TERMS)
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def query_key(query: str) -> tuple:
+    # Queries with the same key parse to the same Intent
+    return tuple(_TOKEN.findall(query.lower()))
+
+
+@dataclass
+class Intent:
+    metrics: list = field(default_factory=list)
+    entities: list = field(default_factory=list)
+    platforms: list = field(default_factory=list)
+    regions: list = field(default_factory=list)
+    content_types: list = field(default_factory=list)
+    superlative: str = None
+    greeting: bool = False
+    help: bool = False
+
+
+class IntentParser:
+    """Extracts metrics, entities, dataset values and superlatives from a query in one pass.
+
+    Phrases are indexed by their first token, so each token of the query costs
+    one dictionary lookup plus a check of the (few) phrases starting with it.
+    """
+
+    def __init__(self, platforms=(), regions=(), content_types=()):
+        vocab = {}
+        for term, metric in METRIC_TERMS.items():
+            vocab[term] = ("metric", metric)
+        for entity, terms in ENTITY_TERMS.items():
+            for term in terms:
+                vocab[term] = ("entity", entity)
+        for kind, terms in SUPERLATIVE_TERMS.items():
+            for term in terms:
+                vocab[term] = ("superlative", kind)
+        for term in GREETING_TERMS:
+            vocab[term] = ("greeting", True)
+        for term in HELP_TERMS:
+            vocab[term] = ("help", True)
+        for kind, values in (("platform", platforms), ("region", regions), ("content_type", content_types)):
+            for value in values:
+                phrase = " ".join(_TOKEN.findall(str(value).lower()))
+                if kind == "content_type" and phrase in VERB_CONTENT_TYPES:
+                    vocab[phrase + "s"] = (kind, value)
+                    vocab[phrase] = ("verb_content_type", value)
+                else:
+                    vocab[phrase] = (kind, value)
+
+        self._index = {}
+        for phrase, meaning in vocab.items():
+            tokens = tuple(phrase.split())
+            self._index.setdefault(tokens[0], []).append((tokens, meaning))
+        for phrases in self._index.values():
+            # Longest phrase first, so "engagement rate" wins over "engagement"
+            phrases.sort(key=lambda p: len(p[0]), reverse=True)
+
+    def parse(self, query: str) -> Intent:
+        tokens = _TOKEN.findall(query.lower())
+        intent = Intent()
+        entities = set()
+        i = 0
+        while i < len(tokens):
+            for phrase, (kind, value) in self._index.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    break
+            else:
+                i += 1
+                continue
+            i += len(phrase)
+            if kind == "metric":
+                if value not in intent.metrics:
+                    intent.metrics.append(value)
+            elif kind == "entity":
+                entities.add(value)
+            elif kind == "superlative":
+                # "best" wins if the query has both
+                if value == "best" or intent.superlative is None:
+                    intent.superlative = value
+            elif kind == "greeting":
+                intent.greeting = True
+            elif kind == "help":
+                intent.help = True
+            elif kind == "verb_content_type":
+                # "post format" is the content type, "post a reel" is not
+                if i < len(tokens) and tokens[i] in TYPE_WORDS and value not in intent.content_types:
+                    intent.content_types.append(value)
+            else:
+                mentions = getattr(intent, kind + "s")
+                if value not in mentions:
+                    mentions.append(value)
+        intent.entities = [e for e in ENTITY_ORDER if e in entities]
+        return intent
+
+
+def _values(series) -> tuple:
+    # Categoricals know every value of the dataset, even ones filtered out of this frame
+    if hasattr(series, "cat"):
+        return tuple(series.cat.categories)
+    return tuple(series.unique())
+
+
+@lru_cache(maxsize=8)
+def _parser(platforms: tuple, regions: tuple, content_types: tuple) -> IntentParser:
+    return IntentParser(platforms, regions, content_types)
+
+
+def parser_for(df) -> IntentParser:
+    return _parser(_values(df["Platform"]), _values(df["Region"]), _values(df["Content_Type"]))
@@ -0,0 +1,268 @@
+# The charts of the dashboard pages. Each is an `aggregate` of the running
+# aggregates for a sidebar selection and a `draw` of its result, called with
+# the values of the widgets the chart depends on; pages render them through a
+# ChartView (components/chartcache.py), which caches both.
+import altair as alt
+import numpy as np
+import pandas as pd
+
+from components.bootstrap import CONFIDENCE, Bootstrap
+from components.charts import boxplot_chart, boxplot_summary
+from components.cube import engagement_rate, rollup
+from components.data import METRIC_COLUMNS
+from components.filters import select_rows
+
+
+def _metric_column(metric: str) -> str:
+    return "Engagement_Rate" if metric == "Engagement Rate (%)" else metric
+
+
+# Trend Overview
+
+def trend_series(aggs, filters, metric, bin_size, window):
+    # Mean metric per bin of posts, from cumulative sums over the running bins
+    platforms = filters.get("Platform", aggs.bins.platforms)
+    regions = filters.get("Region", aggs.bins.regions)
+    return aggs.bins.series(metric, platforms, regions, bin_size=bin_size, window=window)
+
+
+def trend_chart(trend: pd.DataFrame, metric, bin_size, window):
+    smoothing = f", rolling over {window} bins" if window > 1 else ""
+    return alt.Chart(trend).mark_line().encode(
+        x=alt.X("Post:Q", title="Post Number"),
+        y=alt.Y(f"{metric}:Q", title=f"Average {metric}"),
+        color=alt.Color("Platform:N", title="Platform"),
+        tooltip=["Platform", "Post", metric, "Posts"]
+    ).properties(
+        width=600,
+        height=300,
+        title=f"Avg {metric} per {bin_size} Posts{smoothing}"
+    )
+
+
+def engagement_by_platform(aggs, filters):
+    mean_metrics = rollup(aggs.cube, "Platform", filters, metrics=["Likes", "Shares", "Comments"]).reset_index()
+    return mean_metrics.melt(id_vars="Platform", var_name="Metric", value_name="Average")
+
+
+def engagement_by_platform_chart(metrics_long: pd.DataFrame):
+    return alt.Chart(metrics_long).mark_bar().encode(
+        column=alt.Column("Metric", header=alt.Header(title="Metric")),
+        x=alt.X("Platform:N", title="Platform"),
+        y=alt.Y("Average:Q", title="Average"),
+        color=alt.Color("Platform:N", legend=None)
+    ).properties(width=150, height=300)
+
+
+def engagement_levels(aggs, filters):
+    eng_counts = rollup(aggs.cube, "Engagement_Level", filters, stat="count").reset_index()
+    eng_counts.columns = ["Level", "Count"]
+    return eng_counts
+
+
+def engagement_treemap(eng_counts: pd.DataFrame):
+    return alt.Chart(eng_counts).mark_rect().encode(
+        x=alt.X('sum(Count):Q', stack="normalize", axis=None),
+        y=alt.Y('sum(Count):Q', stack=None, axis=None),
+        color=alt.Color('Level:N', title="Engagement Level"),
+        tooltip=['Level', 'Count']
+    ).properties(
+        width=400, height=300, title="Engagement Level Treemap"
+    )
+
+
+# Platform Insights
+
+def platform_averages(aggs, filters, metric):
+    avg_by_platform = rollup(aggs.cube, "Platform", filters, metrics=_metric_column(metric)).reset_index()
+    avg_by_platform.columns = ["Platform", "Average"]
+    # Sort for better visual ordering
+    return avg_by_platform.sort_values("Average", ascending=False)
+
+
+def platform_intervals(aggs, filters, metric):
+    # Platform averages with bootstrap intervals, and where each interval lies
+    # relative to the overall average (the benchmark line)
+    avg_by_platform = platform_averages(aggs, filters, metric)
+    col = _metric_column(metric)
+    rows = select_rows(filters, columns=["Platform"] + (METRIC_COLUMNS if col == "Engagement_Rate" else [col]),
+                       path=aggs.dataset.path)
+    values = engagement_rate(rows) if col == "Engagement_Rate" else rows[col]
+    intervals = Bootstrap(values, rows["Platform"]).table()
+    avg_by_platform["Low"] = avg_by_platform["Platform"].map(intervals["low"]).astype(float)
+    avg_by_platform["High"] = avg_by_platform["Platform"].map(intervals["high"]).astype(float)
+    overall = avg_by_platform["Average"].mean()
+    avg_by_platform["Vs_Benchmark"] = np.select(
+        [avg_by_platform["Low"] > overall, avg_by_platform["High"] < overall], ["above", "below"], "within noise"
+    )
+    return avg_by_platform
+
+
+def benchmark_chart(avg_by_platform: pd.DataFrame, metric):
+    overall = avg_by_platform["Average"].mean()
+    # Both layers share the y scale: same explicit sort, or Vega-Lite drops it
+    y = alt.Y("Platform:N", sort=alt.EncodingSortField("Average", order="descending"), title="Platform")
+    bars = alt.Chart(avg_by_platform).mark_bar(size=30).encode(
+        y=y,
+        x=alt.X("Average:Q", title=f"Avg {metric}"),
+        color=alt.Color("Platform:N", legend=None),
+        # Platforms whose interval contains the benchmark are faded
+        opacity=alt.condition(alt.datum.Vs_Benchmark == "within noise", alt.value(0.45), alt.value(1.0)),
+        tooltip=["Platform", "Average", "Low", "High", alt.Tooltip("Vs_Benchmark", title="Vs benchmark")]
+    )
+    errors = alt.Chart(avg_by_platform).mark_rule(color="black").encode(
+        y=y, x="Low:Q", x2="High:Q"
+    )
+    benchmark = alt.Chart(pd.DataFrame({"y": [-1], "x": [overall]})).mark_rule(color="red").encode(
+        x="x:Q"
+    ).properties(title=f"Avg {metric} by Platform (red line = overall avg, "
+                       f"black = {CONFIDENCE:.0%} interval, faded = within noise of it)")
+    return bars + errors + benchmark
+
+
+def platform_average_chart(avg_by_platform: pd.DataFrame, metric):
+    return alt.Chart(avg_by_platform).mark_bar().encode(
+        x=alt.X("Platform:N", title="Platform"),
+        y=alt.Y("Average:Q", title=f"Average {metric}"),
+        color=alt.Color("Platform:N", legend=None)
+    ).properties(width=400, height=400)
+
+
+def likes_vs_shares(aggs, filters):
+    return rollup(aggs.cube, "Platform", filters, metrics=["Likes", "Shares"]).reset_index()
+
+
+def likes_vs_shares_chart(avg_metrics: pd.DataFrame):
+    return alt.Chart(avg_metrics).mark_circle(size=100).encode(
+        x=alt.X("Likes:Q", title="Average Likes"),
+        y=alt.Y("Shares:Q", title="Average Shares"),
+        color=alt.Color("Platform:N", legend=None),
+        tooltip=["Platform", "Likes", "Shares"]
+    ).properties(width=400, height=350)
+
+
+def total_engagement(aggs, filters):
+    # Likes + shares + comments by platform
+    return (
+        rollup(aggs.cube, "Platform", filters, stat="sum", metrics=["Likes", "Shares", "Comments"])
+          .sum(axis=1)
+          .rename("Total_Engagement")
+          .reset_index()
+    )
+
+
+def total_engagement_chart(total_eng: pd.DataFrame):
+    return alt.Chart(total_eng).mark_bar().encode(
+        x=alt.X("Platform:N", title="Platform"),
+        y=alt.Y("Total_Engagement:Q", title="Total Engagement"),
+        color=alt.Color("Platform:N", legend=None)
+    ).properties(width=400, height=300)
+
+
+def post_counts(aggs, filters):
+    return rollup(aggs.cube, "Platform", filters, stat="count").reset_index()
+
+
+def post_count_chart(post_counts: pd.DataFrame):
+    return alt.Chart(post_counts).mark_bar().encode(
+        x=alt.X("Platform:N", title="Platform"),
+        y=alt.Y("Count:Q", title="Number of Posts"),
+        color=alt.Color("Platform:N", legend=None)
+    ).properties(width=400, height=300)
+
+
+# Content Strategy
+
+def content_engagement(aggs, filters):
+    mean_content = rollup(aggs.cube, "Content_Type", filters, metrics=["Likes", "Shares", "Comments"]).reset_index()
+    return mean_content.melt(id_vars="Content_Type", var_name="Metric", value_name="Average")
+
+
+def content_engagement_chart(content_long: pd.DataFrame):
+    return alt.Chart(content_long).mark_bar().encode(
+        column=alt.Column("Metric", header=alt.Header(title="Metric")),
+        x=alt.X("Content_Type:N", title="Content Type"),
+        y=alt.Y("Average:Q", title="Average"),
+        color=alt.Color("Content_Type:N", legend=None)
+    ).properties(width=150, height=300)
+
+
+def content_counts(aggs, filters):
+    return rollup(aggs.cube, "Content_Type", filters, stat="count").reset_index()
+
+
+def content_donut(type_counts: pd.DataFrame):
+    return alt.Chart(type_counts).mark_arc(innerRadius=50).encode(
+        theta=alt.Theta("Count:Q", title=""),
+        color=alt.Color("Content_Type:N", legend=alt.Legend(title="Content Type")),
+        tooltip=["Content_Type", "Count"]
+    ).properties(width=300, height=300, title="Posts by Content Type (Donut)")
+
+
+def views_heatmap_data(aggs, filters):
+    return rollup(aggs.cube, ["Region", "Content_Type"], filters, metrics="Views").reset_index()
+
+
+def views_heatmap(heatmap_data: pd.DataFrame):
+    return alt.Chart(heatmap_data).mark_rect().encode(
+        x=alt.X("Region:N", title="Region"),
+        y=alt.Y("Content_Type:N", title="Content Type"),
+        color=alt.Color("Views:Q", title="Avg Views")
+    ).properties(width=400, height=300)
+
+
+def top_hashtags(aggs, filters, rank):
+    # Ranked from the hashtag index
+    by = "count" if rank == "Usage Count" else rank
+    ranked = aggs.hashtags.top(5, by=by, filters=filters).reset_index()
+    ranked.columns = ["Hashtag", "Value"]
+    return ranked
+
+
+def top_hashtags_chart(ranked: pd.DataFrame, rank):
+    return alt.Chart(ranked).mark_bar().encode(
+        x=alt.X("Hashtag:N", title="Hashtag", sort=None),
+        y=alt.Y("Value:Q", title=rank if rank == "Usage Count" else f"Avg {rank}"),
+        color=alt.Color("Hashtag:N", legend=None)
+    ).properties(width=400, height=300)
+
+
+def likes_boxplot_data(aggs, filters):
+    # Quartiles and whiskers are computed here; only a sample of outliers goes to the browser
+    data = select_rows(filters, columns=["Content_Type", "Likes"], path=aggs.dataset.path)
+    return boxplot_summary(data, "Content_Type", "Likes")
+
+
+def likes_boxplot(summary):
+    box_summary, box_outliers = summary
+    return boxplot_chart(
+        box_summary, box_outliers, "Content_Type", "Likes", x_title="Content Type", y_title="Likes"
+    ).properties(width=600, height=350)
+
+
+# Page -> chart name -> (aggregate, draw, default widget values)
+CHARTS = {
+    "Trend_Overview": {
+        "trend": (trend_series, trend_chart, ("Views", 50, 1)),
+        "engagement": (engagement_by_platform, engagement_by_platform_chart, ()),
+        "levels": (engagement_levels, engagement_treemap, ()),
+    },
+    "Platform_Insights": {
+        "benchmark": (platform_intervals, benchmark_chart, ("Views",)),
+        "average": (platform_averages, platform_average_chart, ("Views",)),
+        "likes_vs_shares": (likes_vs_shares, likes_vs_shares_chart, ()),
+        "total_engagement": (total_engagement, total_engagement_chart, ()),
+        "post_counts": (post_counts, post_count_chart, ()),
+    },
+    "Content_Strategy": {
+        "engagement": (content_engagement, content_engagement_chart, ()),
+        "donut": (content_counts, content_donut, ()),
+        "heatmap": (views_heatmap_data, views_heatmap, ()),
+        "hashtags": (top_hashtags, top_hashtags_chart, ("Usage Count",)),
+        "likes_boxplot": (likes_boxplot_data, likes_boxplot, ()),
+    },
+}
+
+# Dimension whose single values are precomputed: single-platform views, and
+# single regions on Platform Insights (its only filter)
+WARM_DIMENSIONS = {"Trend_Overview": "Platform", "Platform_Insights": "Region", "Content_Strategy": "Platform"}
@@ -0,0 +1,327 @@
+# Optional multi-core execution of the row-level aggregations. A frame is split
+# into contiguous row ranges, each worker computes a partial aggregate (counts,
+# sums, quantile sketches) and the caller merges them. With one worker, or
+# below MIN_ROWS rows, the same functions run serially in the calling thread.
+#
+#   TRENDS_WORKERS=16 streamlit run home.py                         # process pool
+#   TRENDS_WORKERS=16 TRENDS_BACKEND=thread streamlit run home.py   # thread pool
+import atexit
+import multiprocessing as mp
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import numpy as np
+import pandas as pd
+
+from components.shared import SharedFrame, attach, detach
+
+WORKERS = int(os.environ.get("TRENDS_WORKERS", "1"))
+
+# "process": ranges are read from one shared memory copy of the columns and
+# aggregated without the GIL; "thread": no copy, but pandas only releases the
+# GIL in parts of a groupby
+BACKEND = os.environ.get("TRENDS_BACKEND", "process")
+
+# Smaller frames are aggregated serially: splitting, shipping and merging cost more
+MIN_ROWS = int(os.environ.get("TRENDS_PARALLEL_MIN_ROWS", "1000000"))
+
+# Relative error of quantiles merged from sketches
+SKETCH_ACCURACY = 0.005
+
+
+def process_context():
+    """Start method of every worker process pool: fork, on every Python version.
+
+    While Streamlit runs a page it installs the page script as __main__, and
+    spawn and forkserver workers import __main__ again, i.e. would re-run the
+    page. Forked workers inherit the loaded modules instead. Forking the
+    multi-threaded server can leave a child blocked on a lock another thread
+    held at fork time (Python 3.12+ warns about this, and 3.14 no longer forks
+    by default). Pools fork all their workers once, when they start, and the
+    workers only run numpy/pandas kernels, which keeps that window small.
+    TRENDS_BACKEND=thread avoids processes altogether.
+    """
+    if "fork" not in mp.get_all_start_methods():
+        raise RuntimeError("Worker processes need the fork start method, unavailable here: "
+                           "set TRENDS_BACKEND=thread")
+    return mp.get_context("fork")
+
+
+def _run_range(fn, spec: dict, start: int, stop: int):
+    # Worker side: map the block, aggregate rows [start, stop), unmap
+    df = attach(spec)
+    try:
+        return fn(df.iloc[start:stop])
+    finally:
+        del df
+        detach(spec["name"])
+
+
+class Backend:
+    """A pool of `workers` processes or threads aggregating row ranges of a frame.
+
+    The pool is started on first use and kept for the life of the process.
+    Functions shipped to a process pool must be picklable: module-level
+    functions, or functools.partial of one.
+    """
+
+    def __init__(self, workers: int = WORKERS, kind: str = BACKEND, min_rows: int = MIN_ROWS):
+        if kind not in ("process", "thread"):
+            raise ValueError(f"Unknown backend: {kind}")
+        self.workers = max(1, workers)
+        self.kind = kind
+        self.min_rows = min_rows
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def active(self, n_rows: int) -> bool:
+        return self.workers > 1 and n_rows >= self.min_rows
+
+    def _executor(self):
+        with self._lock:
+            if self._pool is None:
+                if self.kind == "thread":
+                    self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="trends-aggregate")
+                else:
+                    self._pool = ProcessPoolExecutor(self.workers, mp_context=process_context())
+            return self._pool
+
+    def ranges(self, n_rows: int) -> list:
+        edges = np.linspace(0, n_rows, self.workers + 1).astype(np.int64)
+        return [(int(a), int(b)) for a, b in zip(edges[:-1], edges[1:]) if b > a]
+
+    def map(self, fn, df: pd.DataFrame) -> list:
+        """`fn` of every row range of `df`, in row order."""
+        pool = self._executor()
+        ranges = self.ranges(len(df))
+        if self.kind == "thread":
+            return list(pool.map(fn, [df.iloc[a:b] for a, b in ranges]))
+        shared = SharedFrame(df)
+        try:
+            starts, stops = zip(*ranges)
+            n = len(ranges)
+            return list(pool.map(_run_range, [fn] * n, [shared.spec] * n, starts, stops))
+        finally:
+            shared.close()
+
+    def close(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(cancel_futures=True)
+                self._pool = None
+
+
+_backend = None
+_lock = threading.Lock()
+
+
+def get_backend() -> Backend:
+    global _backend
+    with _lock:
+        if _backend is None:
+            _backend = Backend()
+        return _backend
+
+
+def configure(workers: int = WORKERS, kind: str = BACKEND, min_rows: int = MIN_ROWS) -> Backend:
+    # Replaces the process-wide backend (benchmarks, notebooks); the old pool is shut down
+    global _backend
+    with _lock:
+        old, _backend = _backend, Backend(workers, kind, min_rows)
+    if old is not None:
+        old.close()
+    return _backend
+
+
+@atexit.register
+def _shutdown():
+    if _backend is not None:
+        _backend.close()
+
+
+def partials(fn, df: pd.DataFrame, columns=None) -> list:
+    """Partial aggregates of `df` by `fn`: one per row range on the backend, else [fn(df)].
+
+    `columns` limits what is shipped to the workers; the serial path passes
+    `df` through untouched.
+    """
+    backend = get_backend()
+    if not backend.active(len(df)):
+        return [fn(df)]
+    return backend.map(fn, df if columns is None else df[list(columns)])
+
+
+def merge_sums(parts) -> pd.DataFrame:
+    # Partial group sums (counts included) added up group by group
+    if len(parts) == 1:
+        return parts[0]
+    index = parts[0].index
+    return pd.concat(parts).groupby(level=list(range(index.nlevels)), observed=True).sum()
+
+
+def _group_sums(df: pd.DataFrame, by, columns) -> pd.DataFrame:
+    grouped = df.groupby(by, observed=True)
+    sums = grouped[list(columns)].sum()
+    sums.insert(0, "count", grouped.size())
+    return sums
+
+
+def _column_sums(df: pd.DataFrame, columns) -> pd.DataFrame:
+    sums = df[list(columns)].sum().to_frame().T
+    sums.insert(0, "count", len(df))
+    return sums
+
+
+def group_means(df: pd.DataFrame, by, columns) -> pd.DataFrame:
+    """Mean of `columns` per group of `by`: df.groupby(by)[columns].mean(), merged from sums and counts."""
+    # Row counts stand in for per-column counts: dataset columns have no missing values
+    columns = list(columns)
+    if not get_backend().active(len(df)):
+        return df.groupby(by, observed=True)[columns].mean()
+    keys = [by] if isinstance(by, str) else list(by)
+    sums = merge_sums(partials(partial(_group_sums, by=by, columns=columns), df, keys + columns))
+    return sums[columns].div(sums["count"], axis=0)
+
+
+def means(df: pd.DataFrame, columns=None) -> pd.Series:
+    """Column means: df[columns].mean(), merged from sums and counts."""
+    columns = list(df.columns if columns is None else columns)
+    if not get_backend().active(len(df)):
+        return df[columns].mean()
+    sums = pd.concat(partials(partial(_column_sums, columns=columns), df, columns)).sum()
+    return sums[columns] / sums["count"]
+
+
+class QuantileSketch:
+    """Mergeable quantile sketch of non-negative values (DDSketch).
+
+    Values are counted in logarithmic buckets (gamma^(i-1), gamma^i]: any
+    quantile comes back within `accuracy` relative error, and sketches of
+    different rows merge by adding bucket counts. Memory is
+    O(log(max / min) / accuracy) buckets, independent of the number of values.
+    """
+
+    def __init__(self, accuracy: float = SKETCH_ACCURACY):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.zeros = 0
+        self.offset = 0
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    @property
+    def n(self) -> int:
+        return self.zeros + int(self.counts.sum())
+
+    def _add_counts(self, offset: int, counts: np.ndarray):
+        if len(counts) == 0:
+            return
+        if len(self.counts) == 0:
+            self.offset, self.counts = offset, counts.astype(np.int64)
+            return
+        lo = min(self.offset, offset)
+        hi = max(self.offset + len(self.counts), offset + len(counts))
+        merged = np.zeros(hi - lo, dtype=np.int64)
+        merged[self.offset - lo:self.offset - lo + len(self.counts)] += self.counts
+        merged[offset - lo:offset - lo + len(counts)] += counts
+        self.offset, self.counts = lo, merged
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if (values < 0).any():
+            raise ValueError("QuantileSketch only holds non-negative values")
+        positive = values[values > 0]
+        self.zeros += len(values) - len(positive)
+        if len(positive):
+            index = np.ceil(np.log(positive) / np.log(self.gamma)).astype(np.int64)
+            lo = int(index.min())
+            self._add_counts(lo, np.bincount(index - lo))
+        return self
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("Sketches of different accuracy can't be merged")
+        self.zeros += other.zeros
+        self._add_counts(other.offset, other.counts)
+        return self
+
+    def quantile(self, q: float) -> float:
+        n = self.n
+        if n == 0:
+            return np.nan
+        rank = q * (n - 1)
+        if rank < self.zeros:
+            return 0.0
+        bucket = np.searchsorted(np.cumsum(self.counts), rank - self.zeros, side="right")
+        # Midpoint of the bucket in relative terms: off by at most `accuracy`
+        return 2 * self.gamma ** (self.offset + int(bucket)) / (self.gamma + 1)
+
+
+def _group_sketches(df: pd.DataFrame, by: str, value: str, accuracy: float) -> dict:
+    return {key: QuantileSketch(accuracy).update(values.to_numpy())
+            for key, values in df.groupby(by, observed=True)[value]}
+
+
+def _group_index(df: pd.DataFrame, by: str, keys) -> pd.Index:
+    # Groups in the order a serial groupby returns them
+    if isinstance(df[by].dtype, pd.CategoricalDtype):
+        categories = df[by].cat.categories
+        keys = [c for c in categories if c in set(keys)]
+        return pd.CategoricalIndex(keys, categories=categories, name=by)
+    return pd.Index(sorted(keys), name=by)
+
+
+def group_quantiles(df: pd.DataFrame, by: str, value: str, qs, accuracy: float = SKETCH_ACCURACY) -> pd.DataFrame:
+    """Quantiles `qs` of `value` per group, one column each.
+
+    Exact (linear interpolation) on the serial path; merged from per-range
+    QuantileSketches, within `accuracy` relative error, on the backend.
+    Values must be non-negative for the sketches.
+    """
+    if not get_backend().active(len(df)):
+        return df.groupby(by, observed=True)[value].quantile(list(qs)).unstack()
+    merged = {}
+    for part in partials(partial(_group_sketches, by=by, value=value, accuracy=accuracy), df, [by, value]):
+        for key, sketch in part.items():
+            merged.setdefault(key, QuantileSketch(accuracy)).merge(sketch)
+    index = _group_index(df, by, merged)
+    return pd.DataFrame([[merged[key].quantile(q) for q in qs] for key in index], index=index, columns=list(qs))
+
+
+def sample_rows(df: pd.DataFrame, k: int, seed: int = 0) -> pd.DataFrame:
+    # Uniform sample of at most k rows, kept in their original order
+    if len(df) <= k:
+        return df
+    rng = np.random.default_rng(seed)
+    return df.iloc[np.sort(rng.choice(len(df), size=k, replace=False))]
+
+
+def _fences(df: pd.DataFrame, by: str, value: str, bounds: pd.DataFrame, k: int, seed: int):
+    rows = df[[by, value]].join(bounds, on=by)
+    inside = (rows[value] >= rows["lower"]) & (rows[value] <= rows["upper"])
+    whiskers = rows[inside].groupby(by, observed=True)[value].agg(whisker_low="min", whisker_high="max")
+    stats = pd.concat([whiskers, rows.groupby(by, observed=True).size().rename("count")], axis=1)
+    outliers = rows[(rows[value] < rows["lower"]) | (rows[value] > rows["upper"])][[by, value]]
+    return stats, len(outliers), sample_rows(outliers, k, seed)
+
+
+def fences(df: pd.DataFrame, by: str, value: str, bounds: pd.DataFrame, k: int, seed: int = 0):
+    """Per-group extremes inside the `bounds` fences (lower, upper) and a sample of the rest.
+
+    Returns (whisker_low, whisker_high and row count per group, at most k
+    rows outside the fences drawn uniformly).
+    """
+    parts = partials(partial(_fences, by=by, value=value, bounds=bounds, k=k, seed=seed), df, [by, value])
+    if len(parts) == 1:
+        stats, _, outliers = parts[0]
+        return stats, outliers
+    stats = pd.concat([p[0] for p in parts]).groupby(level=0, observed=True).agg(
+        whisker_low=("whisker_low", "min"), whisker_high=("whisker_high", "max"), count=("count", "sum"))
+    stats.index.name = by
+    found = np.array([p[1] for p in parts])
+    samples = [p[2] for p in parts]
+    if found.sum() > k:
+        # How many of the k come from each range, as if drawn from all outliers at once
+        taken = np.random.default_rng(seed).multivariate_hypergeometric(found, k)
+        samples = [sample_rows(s, int(n), seed) for s, n in zip(samples, taken)]
+    return stats, pd.concat(samples)
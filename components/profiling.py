@@ -0,0 +1,138 @@
+# Per-rerun timing and memory of each page's load / filter / aggregate / chart
+# stages. Off unless TRENDS_PROFILE is set, and then free: stage() hands back
+# a shared no-op and timed() leaves functions undecorated.
+#
+#   TRENDS_PROFILE=1 streamlit run home.py              # sidebar panel
+#   TRENDS_PROFILE=reruns.jsonl streamlit run home.py   # panel + one JSON line per rerun
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import pandas as pd
+
+PROFILE = os.environ.get("TRENDS_PROFILE", "")
+ENABLED = PROFILE not in ("", "0")
+
+# Reruns are appended here as JSON lines when TRENDS_PROFILE names a file
+LOG_PATH = PROFILE if PROFILE not in ("", "0", "1") else None
+
+
+class _Noop:
+    # Shared stand-in for Stage while profiling is off; assigning .rows is harmless
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _Noop()
+_local = threading.local()
+_log_lock = threading.Lock()
+
+
+class Stage:
+    """Wall time, rows processed and bytes allocated by one stage of a rerun.
+
+    Allocations come from tracemalloc, which is process-wide: stages running
+    at the same time in other sessions are counted too. Stages don't nest.
+    """
+
+    def __init__(self, rerun, name: str, rows: int = None):
+        self.rerun = rerun
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self._mem = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        ms = (time.perf_counter() - self._t0) * 1000
+        current, peak = tracemalloc.get_traced_memory()
+        self.rerun.stages.append({"stage": self.name, "ms": round(ms, 3), "rows": self.rows,
+                                  "alloc_bytes": current - self._mem, "peak_bytes": peak - self._mem})
+        return False
+
+
+class Rerun:
+    """The stages recorded during one run of a page script."""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.started = time.time()
+        self.stages = []
+        self._t0 = time.perf_counter()
+
+    def record(self) -> dict:
+        return {"page": self.page, "started": self.started,
+                "total_ms": round((time.perf_counter() - self._t0) * 1000, 3), "stages": self.stages}
+
+
+def begin(page: str):
+    # Starts recording this thread's rerun (each Streamlit session reruns in its own thread)
+    if not ENABLED:
+        return None
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _local.rerun = Rerun(page)
+    return _local.rerun
+
+
+def stage(name: str, rows: int = None):
+    """Context manager timing a stage of the current rerun; set `.rows` inside if unknown upfront."""
+    if not ENABLED:
+        return _NOOP
+    rerun = getattr(_local, "rerun", None)
+    return _NOOP if rerun is None else Stage(rerun, name, rows)
+
+
+def timed(name: str):
+    """Decorator recording every call as a stage of the current rerun (if any)."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def summary(rerun: Rerun) -> pd.DataFrame:
+    stages = pd.DataFrame(rerun.stages, columns=["stage", "ms", "rows", "alloc_bytes", "peak_bytes"])
+    grouped = stages.groupby("stage", sort=False).agg(
+        calls=("ms", "size"), ms=("ms", "sum"), rows=("rows", "max"),
+        alloc_mb=("alloc_bytes", "sum"), peak_mb=("peak_bytes", "max"))
+    grouped[["alloc_mb", "peak_mb"]] /= 2**20
+    return grouped.round(2)
+
+
+def end(panel: bool = True):
+    """Finishes the current rerun: appends it to the JSONL log and shows the sidebar panel."""
+    if not ENABLED:
+        return None
+    rerun = getattr(_local, "rerun", None)
+    if rerun is None:
+        return None
+    _local.rerun = None
+    record = rerun.record()
+    if LOG_PATH:
+        with _log_lock, open(LOG_PATH, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
+    if panel:
+        import streamlit as st
+
+        with st.sidebar.expander("⏱ Profiling: this rerun"):
+            st.caption(f"{record['total_ms']:,.1f} ms total")
+            st.dataframe(summary(rerun))
+    return record
@@ -0,0 +1,123 @@
+# Read-only dataset columns in shared memory, so worker processes map the same
+# pages instead of each loading and parsing the export:
+#
+#   shared = get_shared(CSV_PATH, ENGINE_COLUMNS)   # owning process
+#   df = attach(shared.spec)                        # any process, zero-copy
+import atexit
+import threading
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+from components.data import CSV_PATH, DTYPES, get_dataset
+
+# Column offsets inside a block are aligned to this many bytes
+ALIGN = 64
+
+# Every column that can live in shared memory: Post_ID strings are Python objects
+SHARED_COLUMNS = [c for c in DTYPES if c != "Post_ID"] + ["Post_Num"]
+
+
+class SharedFrame:
+    """The columns of a dataframe, copied once into one shared memory block.
+
+    `spec` is a small picklable description of the block; attach(spec) in any
+    process rebuilds the dataframe on top of the same pages without copying.
+    Categoricals are stored as their codes, the categories travel in the spec.
+    The creating process owns the block: close() unlinks it.
+    """
+
+    def __init__(self, df: pd.DataFrame, version=None):
+        layout = []
+        offset = 0
+        for col in df.columns:
+            values = df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                array, categories = values.array.codes, list(values.cat.categories)
+            elif values.dtype.kind in "biuf":
+                array, categories = values.to_numpy(), None
+            else:
+                raise ValueError(f"Column {col!r} ({values.dtype}) can't be shared")
+            layout.append((col, array, categories, offset))
+            offset += -(-array.nbytes // ALIGN) * ALIGN
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        columns = []
+        for col, array, categories, start in layout:
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=self.shm.buf, offset=start)
+            target[:] = array
+            columns.append((col, array.dtype.str, start, categories))
+        self.spec = {"name": self.shm.name, "n_rows": len(df), "columns": columns}
+        self.version = version
+        self.nbytes = offset
+
+    def close(self):
+        # The pages are freed once every process has unmapped them; frames still
+        # alive in this process keep the mapping until they are collected
+        if self.shm is not None:
+            self.shm.unlink()
+            try:
+                self.shm.close()
+            except BufferError:
+                pass
+            self.shm = None
+
+
+# Blocks attached by this process, kept open for as long as their frames may be used
+_attached = {}
+
+
+def attach(spec: dict) -> pd.DataFrame:
+    """Read-only dataframe over the shared block described by `spec`."""
+    shm = _attached.get(spec["name"])
+    if shm is None:
+        shm = _attached[spec["name"]] = shared_memory.SharedMemory(name=spec["name"])
+    data = {}
+    for col, dtype, start, categories in spec["columns"]:
+        values = np.ndarray(spec["n_rows"], dtype=np.dtype(dtype), buffer=shm.buf, offset=start)
+        values.flags.writeable = False
+        if categories is None:
+            data[col] = pd.Series(values, copy=False)
+        else:
+            codes = pd.Categorical.from_codes(values, dtype=pd.CategoricalDtype(categories), validate=False)
+            data[col] = pd.Series(codes, copy=False)
+    return pd.DataFrame(data, copy=False)
+
+
+def detach(name: str):
+    # Unmaps a block attached by this process once its frames are no longer used
+    shm = _attached.pop(name, None)
+    if shm is not None:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # views still alive: the mapping goes when they are collected
+
+
+# Process-wide shared copies of the dataset, one per (CSV path, columns)
+_shared = {}
+_lock = threading.Lock()
+
+
+def get_shared(path: str = CSV_PATH, columns=SHARED_COLUMNS) -> SharedFrame:
+    # Republished (and the stale block unlinked) when rows are appended; processes
+    # still attached to the old block keep their mapping until they exit
+    dataset = get_dataset(path)
+    key = (dataset.path, tuple(columns))
+    with _lock:
+        shared = _shared.get(key)
+        if shared is None or shared.version != dataset.version:
+            version = dataset.version
+            fresh = SharedFrame(dataset.frame(columns, stop=version[1]), version)
+            if shared is not None:
+                shared.close()
+            shared = _shared[key] = fresh
+    return shared
+
+
+@atexit.register
+def _close_all():
+    with _lock:
+        for shared in _shared.values():
+            shared.close()
+        _shared.clear()
@@ -0,0 +1,182 @@
+# Datasets spread over many CSV exports with the same schema, e.g. one file
+# per day and region:
+#
+#   TRENDS_CSV="exports/*.csv" streamlit run home.py   # or TRENDS_CSV=exports/
+#
+# Files are parsed in parallel (pyarrow's CSV reader on a thread pool, or
+# pandas on a process pool without pyarrow) and merged into the one dataset
+# the pages read: a post exported more than once keeps its row from the last
+# file in name order (the latest day), categorical dictionaries are unified
+# across files, and rows are ordered by post number. The merge is kept as a
+# columnar sidecar, so a restart memory-maps it instead of parsing every file.
+import glob
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+
+from components import data
+from components.data import DTYPES, KEY_COLUMNS, Dataset, feather, pa, parse_csv, post_numbers, read_columnar
+from components.parallel import process_context
+
+try:
+    import pyarrow.csv as pa_csv
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa_csv = None
+
+# Files parsed at once
+WORKERS = int(os.environ.get("TRENDS_LOAD_WORKERS", "0")) or os.cpu_count() or 1
+
+
+def list_sources(pattern: str) -> dict:
+    """path -> (mtime, size) of every CSV export in a directory or matching a glob, in name order."""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, "*.csv")
+    return {path: data._signature(path) for path in sorted(glob.glob(pattern)) if os.path.isfile(path)}
+
+
+def _arrow_type(dtype: str):
+    if dtype == "category":
+        return pa.dictionary(pa.int32(), pa.string())
+    if dtype == "string":
+        return pa.string()
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+def _read_arrow(path: str, columns: list):
+    # One file on one thread: files are the unit of parallelism
+    convert = pa_csv.ConvertOptions(column_types={c: _arrow_type(DTYPES[c]) for c in columns},
+                                    include_columns=columns)
+    return pa_csv.read_csv(path, read_options=pa_csv.ReadOptions(use_threads=False), convert_options=convert)
+
+
+def read_exports(paths, columns=None, workers: int = WORKERS) -> pd.DataFrame:
+    """The rows of several exports as one frame, de-duplicated by Post_ID and
+    sorted by Post_Num, with `columns` (default: all of them plus Post_Num)."""
+    paths = list(paths)
+    # Post_ID is always read: it identifies repeated posts
+    usecols = [c for c in DTYPES if columns is None or c in columns or c == "Post_ID"]
+    if pa_csv is not None:
+        with ThreadPoolExecutor(max(1, min(workers, len(paths)))) as pool:
+            tables = list(pool.map(lambda path: _read_arrow(path, usecols), paths))
+        # One dictionary per categorical column across all files
+        df = pa.concat_tables(tables).unify_dictionaries().to_pandas()
+    else:
+        with ProcessPoolExecutor(max(1, min(workers, len(paths))), mp_context=process_context()) as pool:
+            frames = list(pool.map(parse_csv, paths, [usecols] * len(paths)))
+        df = pd.concat(frames, ignore_index=True)
+        categories = [c for c in usecols if DTYPES[c] == "category"]
+        df[categories] = df[categories].astype("category")
+    # A post exported again later keeps its latest values
+    df = df[~df["Post_ID"].duplicated(keep="last").to_numpy()]
+    df = df.assign(Post_Num=post_numbers(df["Post_ID"])).sort_values("Post_Num", kind="stable")
+    df = df.reset_index(drop=True)
+    return df if columns is None else df[list(columns)]
+
+
+def sidecar_path(pattern: str, files: dict) -> str:
+    # Named after the pattern, versioned by the signatures of the files it matched
+    stem = hashlib.blake2b(os.path.abspath(pattern).encode(), digest_size=4).hexdigest()
+    version = hashlib.blake2b(repr(sorted(files.items())).encode(), digest_size=8).hexdigest()
+    return os.path.join(data.CACHE_DIR, f"sources-{stem}-{version}.feather")
+
+
+def convert_sources(pattern: str, files: dict) -> str:
+    # Merge the files into one uncompressed Feather file that loads can memory-map
+    target = sidecar_path(pattern, files)
+    if os.path.exists(target):
+        return target
+    os.makedirs(data.CACHE_DIR, exist_ok=True)
+    df = read_exports(files)
+    tmp = f"{target}.{os.getpid()}.tmp"
+    feather.write_feather(df, tmp, compression="uncompressed")
+    os.replace(tmp, target)
+
+    # Drop merges of earlier sets of files
+    prefix = os.path.basename(target).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(data.CACHE_DIR):
+        old = os.path.join(data.CACHE_DIR, name)
+        if name.startswith(prefix) and name.endswith(".feather") and old != target:
+            os.remove(old)
+    return target
+
+
+class SourceSet(Dataset):
+    """A Dataset merged from every CSV export in a directory or matching a glob.
+
+    refresh() parses files that appeared since the last call and appends
+    their rows; a changed or removed file, or a new file repeating posts
+    already loaded (whose latest values must win), triggers a full reload.
+    """
+
+    def __init__(self, pattern: str):
+        self._files = {}
+        self._batches = []
+        super().__init__(pattern)
+
+    def _load_full(self):
+        self.generation += 1
+        self._files = list_sources(self.path)
+        if not self._files:
+            raise FileNotFoundError(f"no CSV exports match {self.path}")
+        self._frames = {}
+        self._columns = {}
+        self._batches = []  # files appended since, in order: parsed again for columns loaded later
+        self._sidecar = None
+        self._merged = None
+        if feather is not None:
+            try:
+                self._sidecar = convert_sources(self.path, self._files)
+            except (OSError, pa.ArrowException):
+                # Unwritable cache dir: keep the merge in memory instead
+                pass
+        if self._sidecar is None:
+            self._merged = read_exports(self._files)
+        base = self._read_base(KEY_COLUMNS)
+        self._append(base)
+        self.n_rows = self._base_rows = len(base)
+        self.last_post_num = int(base["Post_Num"].max()) if len(base) else 0
+
+    def _read_base(self, columns) -> pd.DataFrame:
+        if self._merged is not None:
+            return self._merged[list(columns)]
+        return read_columnar(self._sidecar, columns)
+
+    def _ensure(self, columns):
+        missing = [c for c in columns if c not in self._columns]
+        if not missing:
+            return
+        try:
+            base = self._read_base(missing)
+        except OSError:
+            self._load_full()
+            return self._ensure(columns)
+        self._append(base[missing])
+        for paths in self._batches:
+            self._append(read_exports(paths, missing))
+
+    def refresh(self) -> bool:
+        """Pick up exports added since the last call; True if the data changed."""
+        with self._lock:
+            files = list_sources(self.path)
+            if files == self._files:
+                return False
+            old = self.version
+            if any(files.get(path) != sig for path, sig in self._files.items()):
+                self._load_full()
+            else:
+                added = [path for path in files if path not in self._files]
+                tail = read_exports(added, list(self._columns))
+                if np.isin(tail["Post_Num"].to_numpy(), self._columns["Post_Num"].view()).any():
+                    self._load_full()
+                else:
+                    self._append(tail)
+                    self._batches.append(added)
+                    self._files = files
+                    self.n_rows += len(tail)
+                    if len(tail):
+                        self.last_post_num = max(self.last_post_num, int(tail["Post_Num"].max()))
+            if self.version != old:
+                self._frames = {}
+            return self.version != old
@@ -0,0 +1,140 @@
+# Out-of-core analytics: the dashboard's statistics in one pass over fixed-size
+# chunks. Memory depends on the chunk size and the number of categories, not on
+# the number of rows, so this works on exports that don't fit in RAM:
+#
+#   stats = stream_stats("full_history.csv", chunk_size=500_000)
+#   rollup(stats.cube, "Platform")
+import numpy as np
+import pandas as pd
+
+from components.cube import CUBE_COLUMNS, build_cube
+from components.data import CSV_PATH, DTYPES, pa, post_numbers
+
+CHUNK_SIZE = 250_000
+
+STREAM_COLUMNS = list(dict.fromkeys(CUBE_COLUMNS + ["Hashtag", "Post_ID"]))
+
+# Trend bins start at this many posts each and double in width whenever more
+# than MAX_BINS are needed, which keeps the early/late split in bounded memory
+BIN_SIZE = 50
+MAX_BINS = 4096
+
+
+def read_chunks(path: str = CSV_PATH, chunk_size: int = CHUNK_SIZE, columns=STREAM_COLUMNS):
+    """Yield dataframes of at most `chunk_size` rows from a CSV or Feather file."""
+    if path.endswith(".feather"):
+        # Record batches of a columnar sidecar, memory-mapped one at a time
+        reader = pa.ipc.open_file(pa.memory_map(path))
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i).select(list(columns))
+            for start in range(0, batch.num_rows, chunk_size):
+                yield batch.slice(start, chunk_size).to_pandas()
+        return
+    dtypes = {c: t for c, t in DTYPES.items() if c in columns}
+    yield from pd.read_csv(path, usecols=list(columns), dtype=dtypes, chunksize=chunk_size)
+
+
+def filter_chunks(chunks, filters=None):
+    for chunk in chunks:
+        for dim, selected in (filters or {}).items():
+            chunk = chunk[chunk[dim].isin(list(selected))]
+        yield chunk
+
+
+class SpaceSaving:
+    """Heavy-hitters sketch: approximate top-k counts in O(capacity) memory.
+
+    Every item whose true count exceeds total / capacity is guaranteed to be
+    tracked; a tracked count overestimates the true one by at most `error`.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+
+    def update(self, counts):
+        for item, n in counts.items():
+            if item in self.counts:
+                self.counts[item] += n
+            elif len(self.counts) < self.capacity:
+                self.counts[item] = n
+                self.errors[item] = 0
+            else:
+                # Evict the smallest counter; the newcomer inherits its count as error
+                smallest = min(self.counts, key=self.counts.get)
+                floor = self.counts.pop(smallest)
+                self.errors.pop(smallest)
+                self.counts[item] = floor + n
+                self.errors[item] = floor
+
+    def top(self, k: int) -> pd.Series:
+        return pd.Series(self.counts, dtype="int64").nlargest(k)
+
+
+class AdaptiveBins:
+    """Sum and count of Views per (post bin, platform) with a bounded number of bins."""
+
+    def __init__(self, bin_size: int = BIN_SIZE, max_bins: int = MAX_BINS):
+        self.width = bin_size
+        self.max_bins = max_bins
+        self.sums = pd.DataFrame()
+        self.counts = pd.DataFrame()
+
+    def update(self, post_num: np.ndarray, platform: pd.Series, views: np.ndarray):
+        bins = (post_num - 1) // self.width
+        part = pd.DataFrame({"Bin": bins, "Platform": platform.to_numpy(), "Views": views})
+        grouped = part.groupby(["Bin", "Platform"], observed=True)["Views"]
+        self.sums = self.sums.add(grouped.sum().unstack(fill_value=0), fill_value=0)
+        self.counts = self.counts.add(grouped.size().unstack(fill_value=0), fill_value=0)
+        while len(self.sums) > self.max_bins:
+            # Merge neighbouring bins: the bin width doubles
+            self.width *= 2
+            self.sums = self.sums.groupby(self.sums.index // 2).sum()
+            self.counts = self.counts.groupby(self.counts.index // 2).sum()
+
+    def early_late(self) -> pd.DataFrame:
+        """Average per-bin mean views per platform before/after the middle bin."""
+        if self.sums.empty:
+            return pd.DataFrame(columns=["Platform", "Period", "Views"])
+        means = (self.sums / self.counts.replace(0, np.nan)).stack().rename("Views").reset_index()
+        means.columns = ["Bin", "Platform", "Views"]
+        midpoint = (means["Bin"].max() + 1) // 2
+        means["Period"] = np.where(means["Bin"] < midpoint, "Early", "Late")
+        return means.groupby(["Platform", "Period"])["Views"].mean().reset_index()
+
+
+class StreamStats:
+    """Mergeable accumulators for everything the pages and chatbot aggregate."""
+
+    def __init__(self, top_k_capacity: int = 100):
+        self.rows = 0
+        self.cube = None
+        self.hashtags = SpaceSaving(top_k_capacity)
+        self.bins = AdaptiveBins()
+
+    def update(self, chunk: pd.DataFrame):
+        if len(chunk) == 0:
+            return
+        self.rows += len(chunk)
+        cube = build_cube(chunk)
+        if self.cube is None:
+            self.cube = cube
+        else:
+            self.cube = self.cube.add(cube, fill_value=0)
+            self.cube["count"] = self.cube["count"].astype("int64")
+        self.hashtags.update(chunk["Hashtag"].value_counts().loc[lambda s: s > 0].to_dict())
+        self.bins.update(post_numbers(chunk["Post_ID"]), chunk["Platform"], chunk["Views"].to_numpy())
+
+    def top_hashtags(self, k: int = 5) -> pd.Series:
+        return self.hashtags.top(k)
+
+    def engagement_levels(self) -> pd.Series:
+        return self.cube.groupby(level="Engagement_Level", observed=True)["count"].sum()
+
+
+def stream_stats(path: str = CSV_PATH, chunk_size: int = CHUNK_SIZE, filters=None) -> StreamStats:
+    stats = StreamStats()
+    for chunk in filter_chunks(read_chunks(path, chunk_size), filters):
+        stats.update(chunk)
+    return stats
@@ -0,0 +1,163 @@
+import threading
+from functools import partial
+import numpy as np
+import pandas as pd
+
+from components.data import METRIC_COLUMNS
+from components.parallel import partials
+
+# Finest bin: every trend series is built from bins of this many posts
+BASE_BIN = 50
+
+# Most bins per platform a series returns: the chart's payload stays the same
+# size however many posts there are
+MAX_POINTS = 500
+
+
+def _bin_sums(df: pd.DataFrame, keys: np.ndarray, n_platforms: int, n_regions: int, metrics) -> tuple:
+    # Post count and metric sums per (bin, platform, region) over the bins these
+    # rows span, bins numbered by position in `keys`: (first bin, counts, sums)
+    b = np.searchsorted(keys, (df["Post_Num"].to_numpy() - 1) // BASE_BIN)
+    first = int(b.min())
+    shape = (int(b.max()) - first + 1, n_platforms, n_regions)
+    cell = np.ravel_multi_index((b - first, df["Platform"].array.codes, df["Region"].array.codes), shape)
+    size = int(np.prod(shape))
+    count = np.bincount(cell, minlength=size).reshape(shape)
+    sums = {m: np.bincount(cell, weights=df[m].to_numpy(dtype=np.float64), minlength=size).reshape(shape)
+            for m in metrics}
+    return first, count, sums
+
+
+class TrendBins:
+    """Post counts and metric sums per (base bin of posts, platform, region).
+
+    Only bins holding posts are stored: `keys` lists their numbers in order
+    and the arrays grow along it, so memory follows the number of posts, not
+    the largest Post_Num (IDs need not be dense), and folding in new rows
+    costs O(rows). Series are answered from cumulative sums over the bin
+    axis: any bin size (a multiple of BASE_BIN), rolling window or
+    platform/region selection costs O(bins), independent of the number of posts.
+    """
+
+    def __init__(self, metrics=METRIC_COLUMNS):
+        self.metrics = list(metrics)
+        self.platforms = []
+        self.regions = []
+        self.n_bins = 0
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.count = np.zeros((0, 0, 0), dtype=np.int64)
+        self.sums = {m: np.zeros((0, 0, 0), dtype=np.float64) for m in self.metrics}
+        self._cumulative = None
+        self._lock = threading.Lock()
+
+    def _grow(self, n_bins: int, n_platforms: int, n_regions: int, at=None):
+        # `at`: new positions of the stored bins, when bins were inserted before them
+        shape = self.count.shape
+        if at is None and n_bins <= shape[0] and n_platforms <= shape[1] and n_regions <= shape[2]:
+            return
+        new_shape = (max(n_bins, 2 * shape[0]), max(n_platforms, shape[1]), max(n_regions, shape[2]))
+
+        def grow(old):
+            grown = np.zeros(new_shape, dtype=old.dtype)
+            if at is None:
+                grown[:shape[0], :shape[1], :shape[2]] = old
+            else:
+                grown[at, :shape[1], :shape[2]] = old[:len(at)]
+            return grown
+
+        self.count = grow(self.count)
+        self.sums = {m: grow(a) for m, a in self.sums.items()}
+
+    def add(self, df: pd.DataFrame):
+        if len(df) == 0:
+            return
+        with self._lock:
+            # Dataset frames share append-only categories, so codes are stable across deltas
+            self.platforms = list(df["Platform"].cat.categories)
+            self.regions = list(df["Region"].cat.categories)
+            bins = np.unique((df["Post_Num"].to_numpy() - 1) // BASE_BIN)
+            new = bins[~np.isin(bins, self.keys)]
+            at = None
+            if len(new) and self.n_bins and new[0] < self.keys[-1]:
+                # Posts older than the last bin (e.g. merged exports): re-index the stored bins
+                keys = np.union1d(self.keys, new)
+                at = np.searchsorted(keys, self.keys)
+            else:
+                keys = np.concatenate([self.keys, new])
+            self.keys = keys
+            self.n_bins = len(keys)
+            self._grow(self.n_bins, len(self.platforms), len(self.regions), at)
+            kernel = partial(_bin_sums, keys=self.keys, n_platforms=len(self.platforms), n_regions=len(self.regions), metrics=self.metrics)
+            for first, count, sums in partials(kernel, df, ["Post_Num", "Platform", "Region"] + self.metrics):
+                block = (slice(first, first + len(count)), slice(0, count.shape[1]), slice(0, count.shape[2]))
+                self.count[block] += count
+                for m in self.metrics:
+                    self.sums[m][block] += sums[m]
+            self._cumulative = None
+
+    def _cumsum(self):
+        # Prefix sums over bins with a leading zero row: rows [a, b) sum to cs[b] - cs[a]
+        if self._cumulative is None:
+            def prefix(a):
+                out = np.zeros((self.n_bins + 1,) + a.shape[1:], dtype=a.dtype)
+                np.cumsum(a[:self.n_bins], axis=0, out=out[1:])
+                return out
+
+            self._cumulative = (prefix(self.count), {m: prefix(a) for m, a in self.sums.items()})
+        return self._cumulative
+
+    def _n_groups(self, step: int) -> int:
+        # Bins of `step` base bins that hold posts
+        group = self.keys // step
+        return int(np.count_nonzero(np.diff(group))) + 1 if len(group) else 0
+
+    def _fit_step(self, step: int, max_points: int) -> int:
+        step = max(step, -(-self.n_bins // max_points))
+        while self._n_groups(step) > max_points:
+            step *= 2
+        return step
+
+    def min_bin_size(self, max_points: int = MAX_POINTS) -> int:
+        """Smallest bin size (a multiple of BASE_BIN) with at most `max_points` bins."""
+        with self._lock:
+            return self._fit_step(1, max_points) * BASE_BIN
+
+    def series(self, metric: str, platforms, regions, bin_size: int = BASE_BIN, window: int = 1,
+               max_points: int = MAX_POINTS) -> pd.DataFrame:
+        """Mean `metric` per bin of `bin_size` posts and platform, optionally a rolling mean.
+
+        With `window` > 1 each point averages the posts of the last `window`
+        bins. Bins are widened (see min_bin_size) when `bin_size` would give
+        more than `max_points` of them. Returns columns Bin, Post (first post
+        number of the bin), Platform, the metric, and Posts (how many posts
+        the point covers).
+        """
+        with self._lock:
+            count_cs, sums_cs = self._cumsum()
+            step = self._fit_step(max(1, bin_size // BASE_BIN), max_points)
+            # Bins of `step` base bins that hold posts, and where each starts in `keys`
+            group = self.keys // step
+            starts = np.flatnonzero(np.diff(group, prepend=group[:1] - 1))
+            groups = group[starts]
+            edges = np.append(starts, self.n_bins)
+            p_idx = [i for i, v in enumerate(self.platforms) if v in set(platforms)]
+            r_idx = [i for i, v in enumerate(self.regions) if v in set(regions)]
+
+            def at_edges(cs):
+                return cs[edges][:, p_idx][:, :, r_idx].sum(axis=2)
+
+            counts = at_edges(count_cs)
+            sums = at_edges(sums_cs[metric])
+        # A window covers the last `window` bins by number, empty ones included
+        lo = np.searchsorted(groups, groups - window + 1)
+        hi = np.arange(1, len(edges))
+        n = counts[hi] - counts[lo]
+        total = sums[hi] - sums[lo]
+        b, j = np.nonzero(n)
+        return pd.DataFrame({
+            "Bin": groups[b],
+            "Post": groups[b] * step * BASE_BIN + 1,
+            "Platform": pd.Categorical.from_codes(np.asarray(p_idx, dtype=np.int64)[j], categories=self.platforms),
+            metric: total[b, j] / n[b, j],
+            "Posts": n[b, j],
+        })
@@ -1,4 +1,5 @@
 import streamlit as st
+from components.chartcache import WARM, warm_in_background
 
 st.set_page_config(page_title="Social Media Trends Dashboard", layout="wide")
 st.title("Welcome to the Viral Social Media Trends Dashboard")
@@ -11,3 +12,7 @@ Use the sidebar to navigate between:
 
 This dashboard helps guide marketing and platform strategy based on social media analytics.
 """)
+
+# Precompute the charts of the most common selections (TRENDS_WARM_CHARTS=1)
+if WARM:
+    warm_in_background()
@@ -1,6 +1,6 @@
 # pages/chatbot_assistant.py
 
-import os, sys, streamlit as st, pandas as pd
+import os, sys, streamlit as st
 
 # ── Ensure project root (where chatbot.py lives) is on sys.path ──
 ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
@@ -8,9 +8,16 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from components.chatbot import create_chatbot   # now Python will see root/chatbot.py
+from components.data import dataset_version, load_data
+from components.chatjobs import prepare
+from components.engine import ENGINE_COLUMNS
+from components.filters import select_index
+from components.ingest import load_aggregates
+from components.profiling import begin, end, stage
 
 # ── the rest of your imports and code ──
 st.set_page_config(page_title="Social Media Analytics Chatbot", layout="wide")
+begin("chatbot_assitant")
 st.title("🤖 Social Media Analytics Chatbot")
 st.markdown("""
 Welcome! Ask questions about your social media performance data
@@ -30,11 +37,9 @@ with st.expander("🔍 Example questions you can ask"):
     - Top 3 platforms by views
     """)
 # Load data
-csv_path = os.path.join(ROOT, "Viral_Social_Media_Trends.csv")
-try:
-    df = pd.read_csv(csv_path)
-except FileNotFoundError:
-    df = pd.read_csv("Viral_Social_Media_Trends.csv")
+with stage("load") as s:
+    df = load_data(columns=["Platform", "Region", "Content_Type"])
+    s.rows = len(df)
 
 # Sidebar filters (same as your other pages)
 st.sidebar.header("Filters for Chatbot Context")
@@ -46,11 +51,27 @@ sel_plat = st.sidebar.multiselect("Platform(s)", platforms, default=platforms)
 sel_reg  = st.sidebar.multiselect("Region(s)",   regions,   default=regions)
 sel_ct   = st.sidebar.multiselect("Content Type(s)", content_typ, default=content_typ)
 
-df_filtered = df[
-    df["Platform"].isin(sel_plat) &
-    df["Region"].isin(sel_reg) &
-    df["Content_Type"].isin(sel_ct)
-]
+# Aggregates are shared per selection and sit on the shared dataset frame: a
+# context holds the selected row positions, not a filtered copy. Hashtag
+# questions are answered from the running hashtag index. The context and its
+# common aggregates are prepared in the background as soon as the selection
+# changes; the chat renders without waiting for them.
+filters = {"Platform": sel_plat, "Region": sel_reg, "Content_Type": sel_ct}
+selection = (
+    dataset_version(),
+    tuple(sorted(map(str, sel_plat))),
+    tuple(sorted(map(str, sel_reg))),
+    tuple(sorted(map(str, sel_ct))),
+)
+with stage("filter"):
+    ctx = prepare(selection, lambda: (
+        load_data(columns=ENGINE_COLUMNS),
+        select_index(filters),
+        load_aggregates().hashtags,
+        filters,
+    ))
 
 st.markdown("---")
-create_chatbot(df_filtered)
+create_chatbot(ctx)
+
+end()